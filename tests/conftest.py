@@ -0,0 +1,17 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+Test configuration: the thetiscore stand-in under "tests/stubs" is put in front of the module search path of this
+process as well as of all subprocesses and spawned worker processes.
+"""
+
+import os
+import sys
+
+STUBS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, STUBS)
+os.environ["PYTHONPATH"] = os.pathsep.join(
+    [STUBS, ROOT] + ([os.environ["PYTHONPATH"]] if os.environ.get("PYTHONPATH") else [])
+)
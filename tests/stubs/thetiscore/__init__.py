@@ -0,0 +1,65 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+Minimal stand-in for thetiscore used by the test suite. The evaluation returns the number of samples so that
+tests can check which inputs arrived, and special config keys trigger errors.
+"""
+
+import os
+import json
+import builtins
+from io import StringIO
+import pandas as pd
+
+from . import errors
+
+
+def thetis(*, config, predictions, annotations, output_dir=None, **kwargs):
+    if isinstance(config, dict) and "raise" in config:
+        error = getattr(errors, config["raise"], None) or getattr(builtins, config["raise"])
+        raise error("requested by test config")
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "report.pdf"), "w") as f:
+            f.write("pdf")
+
+    if isinstance(annotations, dict):
+        missing = [key for key in predictions if key not in annotations["__meta__"].index]
+        if missing:
+            raise AttributeError(f"Meta information missing for images {missing}.")
+
+    if isinstance(predictions, pd.DataFrame):
+        n_samples = len(predictions)
+        n_images = None
+    else:
+        n_samples = sum(len(frame) for frame in predictions.values())
+        n_images = len(predictions)
+
+    return {"performance": {"n_samples": n_samples, "n_images": n_images, "score": 1.0 - 1e-3 * n_samples}}
+
+
+def thetis_mlflow(*, mlflow_step=None, **kwargs):
+    return thetis(**kwargs)
+
+
+def write_json_with_pandas(json_like, filename):
+
+    def encode(obj):
+        if isinstance(obj, pd.DataFrame):
+            return {"__frame__": obj.to_json(orient="split")}
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    with open(filename, "w") as f:
+        json.dump(json_like, f, default=encode)
+
+
+def read_json_with_pandas(json_filename):
+
+    def decode(obj):
+        if "__frame__" in obj:
+            return pd.read_json(StringIO(obj["__frame__"]), orient="split")
+        return obj
+
+    with open(json_filename, "r") as f:
+        return json.load(f, object_hook=decode)
@@ -0,0 +1,9 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+class ThetisInternalError(Exception):
+    pass
+
+
+class LicenseInvalidError(Exception):
+    pass
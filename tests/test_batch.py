@@ -0,0 +1,112 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import pytest
+import pandas as pd
+
+from thetis import thetis_batch, thetis_robustness, write_json_with_pandas
+
+
+def _frame_formats():
+    try:
+        import pyarrow  # noqa: F401
+        return ["json", "arrow"]
+    except ImportError:
+        return ["json"]
+
+
+def _long_format(image_ids):
+    predictions = pd.DataFrame({
+        "image_id": [image_ids[0], image_ids[0], image_ids[1]],
+        "labels": ["person", "car", "car"],
+        "confidence": [0.9, 0.8, 0.7],
+    })
+    annotations = pd.DataFrame({
+        "image_id": [image_ids[0], image_ids[1]],
+        "target": ["person", "car"],
+    })
+    meta = pd.DataFrame({"width": [640, 640], "height": [480, 480]}, index=list(image_ids))
+    return predictions, annotations, meta
+
+
+def _dict_layout(table: pd.DataFrame, image_ids) -> dict:
+    return {
+        image_id: table[table["image_id"] == image_id].drop(columns="image_id").reset_index(drop=True)
+        for image_id in image_ids
+    }
+
+
+@pytest.mark.parametrize("frame_format", _frame_formats())
+@pytest.mark.parametrize("image_ids", [("img_0", "img_1"), (0, 1)])
+@pytest.mark.parametrize("layout", ["dict", "long"])
+def test_path_entries(tmp_path, frame_format, image_ids, layout):
+    if frame_format == "json" and layout == "dict" and not isinstance(image_ids[0], str):
+        pytest.skip("the plain JSON format stores dictionary keys as strings")
+
+    predictions, annotations, meta = _long_format(image_ids)
+
+    path = str(tmp_path / "predictions.json")
+    content = _dict_layout(predictions, image_ids) if layout == "dict" else {"predictions": predictions}
+    write_json_with_pandas(json_like=content, filename=path, frame_format=frame_format)
+
+    # path entries are supported with long-format annotations ...
+    results = thetis_batch(config={}, predictions={"model": path}, annotations=annotations, annotations_meta=meta)
+    assert results["model"]["performance"] == {"n_samples": 3, "n_images": 2, "score": pytest.approx(0.997)}
+
+    # ... and in dictionary layout (without 'annotations_meta')
+    if layout == "dict":
+        annotations = {**_dict_layout(annotations, image_ids), "__meta__": meta}
+        results = thetis_batch(config={}, predictions={"model": path}, annotations=annotations)
+        assert results["model"]["performance"]["n_images"] == 2
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_robustness_with_lazy_path_entries(tmp_path, n_jobs):
+    predictions, annotations, meta = _long_format(("img_0", "img_1"))
+
+    def perturbations():
+        for n_boxes in (1, 2):
+            path = str(tmp_path / f"perturbed_{n_boxes}.json")
+            write_json_with_pandas(json_like={"predictions": predictions.iloc[:n_boxes]}, filename=path)
+            yield f"drop_{n_boxes}", path
+
+    result = thetis_robustness(
+        config={},
+        predictions=predictions,
+        annotations=annotations,
+        annotations_meta=meta,
+        perturbations=perturbations(),
+        n_jobs=n_jobs,
+    )
+
+    assert list(result["perturbations"]) == ["drop_1", "drop_2"]
+    assert result["degradation"].loc["drop_1", "performance/n_samples"] == -2
+    assert result["degradation"].loc["drop_2", "performance/score"] == pytest.approx(0.001)
+
+
+@pytest.mark.parametrize("name", ["../escaped", "sub/model", "..", "", 1])
+def test_names_must_stay_within_output_dir(tmp_path, name):
+    predictions, annotations, meta = _long_format(("img_0", "img_1"))
+    kwargs = dict(config={"task": "detection"}, annotations=annotations, annotations_meta=meta,
+                  output_dir=str(tmp_path / "output"), license_xml_str="<license/>")
+
+    with pytest.raises(ValueError, match="Invalid name"):
+        thetis_batch(predictions={"model": predictions, name: predictions}, **kwargs)
+
+    with pytest.raises(ValueError, match="Invalid name"):
+        thetis_robustness(predictions=predictions, perturbations={name: predictions}, **kwargs)
+
+    assert not (tmp_path / "escaped").exists()
+
+
+def test_names_without_output_dir():
+    predictions, annotations, meta = _long_format(("img_0", "img_1"))
+    results = thetis_batch(
+        config={"task": "detection"},
+        predictions={"sub/model": predictions},
+        annotations=annotations,
+        annotations_meta=meta,
+        license_xml_str="<license/>",
+    )
+
+    assert results["sub/model"]["performance"]["n_samples"] == 3
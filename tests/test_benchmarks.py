@@ -0,0 +1,18 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+from thetis.benchmarks import run_benchmark
+from thetis.benchmarks.harness import TASKS, DEFAULT_SIZES
+
+
+def test_default_sizes_are_task_specific():
+    assert set(DEFAULT_SIZES) == set(TASKS)
+    assert max(DEFAULT_SIZES["detection"]) <= 100_000
+
+
+def test_run_benchmark_smoke():
+    results = run_benchmark(tasks=TASKS, aspects=("performance",), sizes=(20,), isolate=False)
+
+    assert list(results["task"]) == list(TASKS)
+    assert (results["size"] == 20).all()
+    assert (results["wall_time_s"] > 0).all()
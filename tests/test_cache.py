@@ -0,0 +1,148 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import os
+import pytest
+import pandas as pd
+
+import thetis.service
+from thetis import thetis as thetis_main, ResultCache
+from thetis.cache import LICENSE_CHECK_INTERVAL, LICENSES_DIRNAME
+
+
+@pytest.fixture
+def core_calls(monkeypatch):
+    calls = []
+    core = thetis.service.thetiscore_main
+
+    def counting_core(**kwargs):
+        calls.append(kwargs)
+        return core(**kwargs)
+
+    monkeypatch.setattr(thetis.service, "thetiscore_main", counting_core)
+    return calls
+
+
+def _evaluate(cache, output_dir=None, n_samples=3, config=None):
+    return thetis_main(
+        config=config or {"task": "classification"},
+        predictions=pd.DataFrame({"labels": list(range(n_samples))}),
+        annotations=pd.DataFrame({"target": list(range(n_samples))}),
+        output_dir=output_dir,
+        license_xml_str="<license/>",
+        cache=cache,
+    )
+
+
+def test_hit_skips_core(tmp_path, core_calls):
+    cache = ResultCache(tmp_path / "cache")
+
+    first = _evaluate(cache)
+    second = _evaluate(cache)
+    assert len(core_calls) == 1
+    assert second == first
+
+    _evaluate(cache, n_samples=4)
+    assert len(core_calls) == 2
+
+
+def test_license_verification_is_shared_between_cache_instances(tmp_path, core_calls):
+    _evaluate(ResultCache(tmp_path / "cache"))
+
+    # e.g., a new process or CI job using the same cache directory
+    _evaluate(ResultCache(tmp_path / "cache"))
+    assert len(core_calls) == 1
+
+
+def test_expired_license_verification_misses(tmp_path, core_calls):
+    cache = ResultCache(tmp_path / "cache")
+    _evaluate(cache)
+
+    expired = os.stat(tmp_path / "cache").st_mtime - 2 * LICENSE_CHECK_INTERVAL
+    for name in os.listdir(tmp_path / "cache" / LICENSES_DIRNAME):
+        os.utime(tmp_path / "cache" / LICENSES_DIRNAME / name, (expired, expired))
+
+    _evaluate(cache)
+    assert len(core_calls) == 2
+
+    _evaluate(cache)
+    assert len(core_calls) == 2
+
+
+def test_unverified_license_misses_unless_skipped(tmp_path, core_calls):
+    cache = ResultCache(tmp_path / "cache")
+    key = cache.key(config={}, predictions=None, annotations=None)
+    cache.put(key, {"performance": {"score": 1.0}})
+
+    assert cache.get_or_compute(key, lambda: {"performance": {"score": 0.5}}) == {"performance": {"score": 0.5}}
+
+    skipping = ResultCache(tmp_path / "cache", skip_license_check=True)
+    assert skipping.get_or_compute(key, lambda: {}) == {"performance": {"score": 1.0}}
+
+
+def test_artifacts_restored_to_new_output_dir(tmp_path, core_calls):
+    cache = ResultCache(tmp_path / "cache")
+    _evaluate(cache, output_dir=str(tmp_path / "first"))
+
+    _evaluate(cache, output_dir=str(tmp_path / "second"))
+    assert len(core_calls) == 1
+    assert (tmp_path / "second" / "report.pdf").read_text() == "pdf"
+
+
+def test_entry_without_artifacts_misses_with_output_dir(tmp_path, core_calls):
+    cache = ResultCache(tmp_path / "cache")
+    _evaluate(cache)
+
+    _evaluate(cache, output_dir=str(tmp_path / "report"))
+    assert len(core_calls) == 2
+    assert (tmp_path / "report" / "report.pdf").is_file()
+
+    # the entry has been replaced by one with artifacts
+    _evaluate(cache, output_dir=str(tmp_path / "again"))
+    assert len(core_calls) == 2
+    assert (tmp_path / "again" / "report.pdf").is_file()
+
+
+def test_eviction_in_least_recently_used_order(tmp_path):
+    cache = ResultCache(tmp_path / "cache", skip_license_check=True)
+    result = {"values": list(range(100))}
+
+    keys = ["a", "b", "c"]
+    for i, key in enumerate(keys):
+        cache.put(key, result)
+        os.utime(tmp_path / "cache" / key, ns=(i * 10 ** 9, i * 10 ** 9))
+
+    entry_size = os.path.getsize(tmp_path / "cache" / "a" / "result.json")
+    assert cache.get("a") is not None
+
+    cache.max_size = 2 * entry_size
+    cache.evict()
+
+    assert sorted(os.listdir(tmp_path / "cache")) == ["a", "c"]
+
+
+def test_key_independent_of_dict_key_order(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    frame = pd.DataFrame({"target": [0, 1]})
+
+    first = cache.key(
+        config={"task": "classification", "task_settings": {"a": 1, "b": 2}},
+        predictions={"x": frame, "y": frame},
+        annotations=frame,
+        description={"name": "model", "version": "1"},
+    )
+    second = cache.key(
+        config={"task_settings": {"b": 2, "a": 1}, "task": "classification"},
+        predictions={"y": frame, "x": frame},
+        annotations=frame,
+        description={"version": "1", "name": "model"},
+    )
+    changed = cache.key(
+        config={"task": "classification", "task_settings": {"a": 1, "b": 3}},
+        predictions={"x": frame, "y": frame},
+        annotations=frame,
+        description={"name": "model", "version": "1"},
+    )
+
+    assert first == second
+    assert first != changed
@@ -0,0 +1,80 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import numpy as np
+import pytest
+import pandas as pd
+
+from thetis import add_intersectional_attributes
+
+
+CONFIG = {
+    "task_settings": {"distinct_classes": ["person", "car", "bicycle"]},
+    "fairness": {"sensitive_attributes": {"gender": ["bicycle", "person"], "age": ["person", "bicycle"]}},
+}
+
+
+def test_valid_classes_follow_distinct_classes_order():
+    annotations = pd.DataFrame({"target": ["person"], "gender": ["female"], "age": ["adult"]})
+    _, config = add_intersectional_attributes(annotations=annotations, config=CONFIG, intersections=[("gender", "age")])
+
+    assert config["fairness"]["sensitive_attributes"]["gender&age"] == ["person", "bicycle"]
+    assert "gender&age" not in CONFIG["fairness"]["sensitive_attributes"]
+
+
+def test_detection_with_empty_images():
+    meta = pd.DataFrame({"width": [640] * 3, "height": [480] * 3}, index=["a", "b", "c"])
+    annotations = {
+        "a": pd.DataFrame({"target": ["person", "car"], "gender": ["female", "male"], "age": ["adult", np.nan]}),
+        "b": pd.DataFrame(),
+        "c": pd.DataFrame({"target": ["person"], "gender": ["male"], "age": ["child"]}),
+        "__meta__": meta,
+    }
+
+    result, _ = add_intersectional_attributes(annotations=annotations, config=CONFIG, intersections=[("gender", "age")])
+
+    assert list(result.keys()) == ["a", "b", "c", "__meta__"]
+    assert result["a"]["gender&age"].tolist()[0] == "female&adult"
+    assert pd.isna(result["a"]["gender&age"].tolist()[1])
+    assert len(result["b"]) == 0 and "gender&age" in result["b"].columns
+    assert result["c"]["gender&age"].tolist() == ["male&child"]
+    assert result["__meta__"] is meta
+
+
+@pytest.mark.parametrize("annotations", [
+    {"__meta__": pd.DataFrame({"width": [], "height": []})},
+    {"a": pd.DataFrame(), "__meta__": pd.DataFrame({"width": [640], "height": [480]}, index=["a"])},
+    pd.DataFrame(),
+])
+def test_no_annotated_samples(annotations):
+    result, config = add_intersectional_attributes(
+        annotations=annotations, config=CONFIG, intersections=[("gender", "age")])
+
+    assert config["fairness"]["sensitive_attributes"]["gender&age"] == ["person", "bicycle"]
+    frames = [v for k, v in result.items() if k != "__meta__"] if isinstance(result, dict) else [result]
+    assert all(len(frame) == 0 and "gender&age" in frame.columns for frame in frames)
+
+
+def test_missing_attribute_column():
+    annotations = {"a": pd.DataFrame({"target": ["person"], "gender": ["female"]}), "b": pd.DataFrame()}
+    with pytest.raises(AttributeError):
+        add_intersectional_attributes(annotations=annotations, config=CONFIG, intersections=[("gender", "age")])
+
+
+def test_integer_coded_attributes_with_missing_values():
+    annotations = pd.DataFrame({"target": ["person"] * 3, "gender": [1, 0, np.nan], "age": ["adult", "child", "adult"]})
+    result, _ = add_intersectional_attributes(annotations=annotations, config=CONFIG, intersections=[("gender", "age")])
+
+    labels = result["gender&age"].tolist()
+    assert labels[:2] == ["1&adult", "0&child"]
+    assert pd.isna(labels[2])
+
+
+def test_empty_fairness_section(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("task: classification\nfairness:\n")
+    annotations = pd.DataFrame({"target": ["person"], "gender": ["female"], "age": ["adult"]})
+
+    _, result = add_intersectional_attributes(
+        annotations=annotations, config=str(config), intersections=[("gender", "age")])
+    assert result["fairness"]["sensitive_attributes"] == {"gender&age": "all"}
@@ -0,0 +1,54 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import sys
+import json
+import subprocess
+
+HEAVY_MODULES = ("thetiscore", "pandas", "mlflow")
+
+SCRIPT = """
+import sys, json
+import thetis
+imported = sorted(m for m in {heavy} if m in sys.modules)
+resolved_before = "thetis" in vars(thetis)
+function = thetis.thetis
+print(json.dumps({{
+    "imported": imported,
+    "resolved_before": resolved_before,
+    "resolved_after": vars(thetis).get("thetis") is function,
+    "module": function.__module__,
+}}))
+""".format(heavy=HEAVY_MODULES)
+
+
+def _imported_by_importtime(stderr: str) -> set:
+    """ Top-level module names from the output of 'python -X importtime'. """
+
+    modules = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+
+    return modules
+
+
+def test_import_does_not_load_heavy_dependencies():
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import thetis"],
+        capture_output=True, text=True, check=True,
+    )
+
+    imported = _imported_by_importtime(process.stderr)
+    assert "thetis" in imported
+    assert not imported.intersection(HEAVY_MODULES)
+
+
+def test_public_api_resolves_lazily():
+    process = subprocess.run([sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True)
+    state = json.loads(process.stdout)
+
+    assert state["imported"] == []
+    assert not state["resolved_before"]
+    assert state["resolved_after"]
+    assert state["module"] == "thetis.service"
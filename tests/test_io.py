@@ -0,0 +1,51 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import datetime
+import pytest
+import pandas as pd
+
+from thetis import read_json_with_pandas, read_json_lazy, write_json_with_pandas
+
+pytest.importorskip("pyarrow")
+
+
+def _detection_annotations() -> dict:
+    return {
+        0: pd.DataFrame({"target": ["person"], "xmin": [1.0]}),
+        1: pd.DataFrame({"target": ["car", "person"], "xmin": [2.0, 3.0]}),
+        "__meta__": pd.DataFrame({"width": [640, 640], "height": [480, 480]}, index=[0, 1]),
+    }
+
+
+@pytest.mark.parametrize("frame_format", ["arrow", "parquet"])
+def test_non_string_keys_round_trip(tmp_path, frame_format):
+    filename = str(tmp_path / "annotations.json")
+    content = {"annotations": _detection_annotations(), "groups": {("a", 1): 1.0, None: 2.0}}
+    write_json_with_pandas(json_like=content, filename=filename, frame_format=frame_format)
+
+    for result in (read_json_with_pandas(filename), read_json_lazy(filename).to_dict()):
+        annotations = result["annotations"]
+        assert list(annotations.keys()) == [0, 1, "__meta__"]
+        assert list(annotations["__meta__"].index) == [0, 1]
+        pd.testing.assert_frame_equal(annotations[1], content["annotations"][1])
+        assert result["groups"] == {("a", 1): 1.0, None: 2.0}
+
+
+def test_unsupported_key_type_raises(tmp_path):
+    content = {datetime.date(2024, 1, 1): pd.DataFrame({"a": [1]})}
+    with pytest.raises(TypeError, match="date"):
+        write_json_with_pandas(json_like=content, filename=str(tmp_path / "x.json"), frame_format="arrow")
+
+
+@pytest.mark.parametrize("frame_format", ["arrow", "parquet"])
+def test_non_string_top_level_keys(tmp_path, frame_format):
+    filename = str(tmp_path / "annotations.json")
+    write_json_with_pandas(json_like=_detection_annotations(), filename=filename, frame_format=frame_format)
+
+    assert list(read_json_with_pandas(filename).keys()) == [0, 1, "__meta__"]
+
+    lazy = read_json_lazy(filename)
+    assert list(lazy) == [0, 1, "__meta__"]
+    assert lazy[1]["target"].tolist() == ["car", "person"]
+    assert list(lazy["__meta__"].index) == [0, 1]
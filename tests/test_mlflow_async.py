@@ -0,0 +1,87 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import threading
+import pytest
+import pandas as pd
+
+mlflow = pytest.importorskip("mlflow")
+
+from thetis import thetis_mlflow_async
+from thetis.mlflow import _get_executor
+
+
+@pytest.fixture
+def tracking(tmp_path, monkeypatch):
+    monkeypatch.setenv("MLFLOW_DISABLE_AGENT_HINT", "1")
+    mlflow.set_tracking_uri(f"sqlite:///{tmp_path / 'mlflow.db'}")
+    yield mlflow.MlflowClient()
+    while mlflow.active_run() is not None:
+        mlflow.end_run()
+
+
+def _evaluate_async(step: int):
+    return thetis_mlflow_async(
+        config={},
+        predictions=pd.DataFrame({"labels": [0, 1]}),
+        annotations=pd.DataFrame({"target": [0, 1]}),
+        mlflow_step=step,
+        profile=True,
+    )
+
+
+def test_requires_active_run(tracking):
+    with pytest.raises(RuntimeError, match="active MLflow run"):
+        _evaluate_async(0)
+
+
+def test_logs_to_caller_run_without_terminating_it(tracking):
+    for _ in range(2):
+        with mlflow.start_run() as run:
+            futures = [_evaluate_async(step) for step in range(3)]
+            results = [future.result() for future in futures]
+
+            assert all(result["performance"]["n_samples"] == 2 for result in results)
+
+            info = tracking.get_run(run.info.run_id).info
+            assert info.status == "RUNNING"
+            assert info.end_time is None
+
+        history = tracking.get_metric_history(run.info.run_id, "timings/thetis_mlflow/wall_time_s")
+        assert sorted(metric.step for metric in history) == [0, 1, 2]
+        assert tracking.get_run(run.info.run_id).info.status == "FINISHED"
+
+
+def test_run_finished_while_evaluations_are_queued(tracking):
+
+    # hold back the background thread until the caller has finished its run
+    release = threading.Event()
+    blocker = _get_executor().submit(release.wait)
+
+    with mlflow.start_run() as run:
+        futures = [_evaluate_async(step) for step in range(2)]
+
+    finished = tracking.get_run(run.info.run_id).info
+    assert finished.status == "FINISHED"
+
+    release.set()
+    blocker.result()
+    assert all(future.result()["performance"]["n_samples"] == 2 for future in futures)
+
+    info = tracking.get_run(run.info.run_id).info
+    assert info.status == "FINISHED"
+    assert info.end_time == finished.end_time
+
+    history = tracking.get_metric_history(run.info.run_id, "timings/thetis_mlflow/wall_time_s")
+    assert sorted(metric.step for metric in history) == [0, 1]
+    assert mlflow.active_run() is None
+
+
+def test_requires_thread_local_run_tracking(tracking, monkeypatch):
+    from mlflow.tracking import fluent
+
+    # older MLflow versions share a plain list as run stack between all threads
+    with monkeypatch.context() as patch:
+        patch.setattr(fluent, "_active_run_stack", [])
+        with pytest.raises(RuntimeError, match="requires MLflow"):
+            _evaluate_async(0)
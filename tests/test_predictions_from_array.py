@@ -0,0 +1,49 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import numpy as np
+import pytest
+
+from thetis import predictions_from_array
+
+
+def _confidence(n_classes: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    confidence = rng.random((5, n_classes), dtype=np.float32)
+    return confidence / confidence.sum(axis=1, keepdims=True)
+
+
+def test_multiclass_columns_reference_array():
+    confidence = _confidence(3)
+    frame = predictions_from_array(confidence, distinct_classes=["a", "b", "c"])
+
+    assert list(frame.columns) == ["labels", "confidence_a", "confidence_b", "confidence_c"]
+    assert frame["labels"].tolist() == list(np.asarray(["a", "b", "c"])[confidence.argmax(axis=1)])
+    for column, label in enumerate("abc"):
+        values = frame[f"confidence_{label}"].to_numpy()
+        assert values.dtype == np.float32
+        assert np.shares_memory(values, confidence[:, column])
+
+
+def test_binary_column_references_array():
+    confidence = _confidence(2)
+    frame = predictions_from_array(confidence, distinct_classes=[0, 1], binary_positive_label=1, labels=[1] * 5)
+
+    assert list(frame.columns) == ["labels", "confidence"]
+    assert frame["labels"].tolist() == [1] * 5
+    values = frame["confidence"].to_numpy()
+    assert values.dtype == np.float32
+    assert np.shares_memory(values, confidence[:, 1])
+
+
+@pytest.mark.parametrize("shape", [(5,), (5, 2), (5, 3, 1)])
+def test_invalid_shape(shape):
+    with pytest.raises(ValueError, match="shape"):
+        predictions_from_array(np.zeros(shape, dtype=np.float32), distinct_classes=["a", "b", "c"])
+
+
+@pytest.mark.parametrize("distinct_classes, label", [(["a", "b", "c"], "a"), (["a", "b"], "c")])
+def test_invalid_binary_positive_label(distinct_classes, label):
+    confidence = _confidence(len(distinct_classes))
+    with pytest.raises(ValueError, match="binary_positive_label"):
+        predictions_from_array(confidence, distinct_classes=distinct_classes, binary_positive_label=label)
@@ -0,0 +1,69 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import pandas as pd
+
+from thetis import thetis, ResultCache
+from thetis.profiling import Profiler, TIMINGS_KEY
+
+RECORD_KEYS = {"wall_time_s", "cpu_time_s", "peak_rss_mb", "peak_rss_increase_mb"}
+
+
+def _evaluate(**kwargs):
+    return thetis(
+        config={"task": "classification"},
+        predictions=pd.DataFrame({"labels": [0, 1]}),
+        annotations=pd.DataFrame({"target": [0, 1]}),
+        license_xml_str="<license/>",
+        **kwargs,
+    )
+
+
+def test_stage_names():
+    assert TIMINGS_KEY not in _evaluate()
+
+    timings = _evaluate(profile=True)[TIMINGS_KEY]
+    assert set(timings) == {"thetis", "thetis/prepare_inputs", "thetis/evaluation"}
+    assert all(set(record) == RECORD_KEYS for record in timings.values())
+    assert timings["thetis"]["wall_time_s"] >= timings["thetis/evaluation"]["wall_time_s"] >= 0.
+
+
+def test_stage_names_with_cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+
+    timings = _evaluate(profile=True, cache=cache)[TIMINGS_KEY]
+    assert set(timings) == {"thetis", "thetis/prepare_inputs", "thetis/cache_key", "thetis/evaluation"}
+
+    # the evaluation by thetiscore is skipped on a cache hit
+    timings = _evaluate(profile=True, cache=cache)[TIMINGS_KEY]
+    assert set(timings) == {"thetis", "thetis/prepare_inputs", "thetis/cache_key"}
+
+
+def test_span_hook_calls():
+    calls = []
+    result = _evaluate(span_hook=lambda name, record: calls.append((name, record)))
+
+    # stages are reported when they have finished, so enclosing stages come last
+    assert [name for name, _ in calls] == ["thetis/prepare_inputs", "thetis/evaluation", "thetis"]
+    assert all(set(record) == RECORD_KEYS for _, record in calls)
+    assert TIMINGS_KEY not in result
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            pass
+
+    assert profiler.timings() == {}
+    assert profiler.metrics() == {}
+
+
+def test_metrics():
+    profiler = Profiler()
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            pass
+
+    metrics = profiler.metrics()
+    assert set(metrics) == {f"timings/{stage}/{key}" for stage in ("outer", "outer/inner") for key in RECORD_KEYS}
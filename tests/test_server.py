@@ -0,0 +1,245 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import tempfile
+import subprocess
+import pytest
+import pandas as pd
+
+pytest.importorskip("pyarrow")
+
+from thetis import ThetisClient
+from thetis.data import detection_inputs_from_tables
+from thetis.server import encode_request, decode_request, _to_long_format, _resolve_output_dir, _error_status
+from thetiscore import errors
+
+
+def _classification():
+    predictions = pd.DataFrame({"labels": ["a", "b", "a"], "confidence": [0.9, 0.6, 0.7]}, index=[10, 11, 12])
+    annotations = pd.DataFrame({"target": ["a", "b", "b"], "gender": ["f", "m", "f"]}, index=[10, 11, 12])
+    return predictions, annotations
+
+
+def _detection():
+    predictions = {
+        "img_0": pd.DataFrame({"labels": ["person", "car"], "confidence": [0.9, 0.8], "xmin": [1.0, 2.0]}),
+        "img_1": pd.DataFrame({"labels": ["car"], "confidence": [0.7], "xmin": [3.0]}),
+    }
+    annotations = {
+        "img_0": pd.DataFrame({"target": ["person"], "xmin": [1.0]}),
+        "img_1": pd.DataFrame({"target": ["car", "car"], "xmin": [3.0, 4.0]}),
+        "__meta__": pd.DataFrame({"width": [640, 640], "height": [480, 480]}, index=["img_0", "img_1"]),
+    }
+    return predictions, annotations
+
+
+def test_round_trip_classification():
+    predictions, annotations = _classification()
+    header = {"config": {"task_settings": {"distinct_classes": ["a", "b"]}}, "description": None}
+
+    kwargs = decode_request(encode_request(header, {"predictions": predictions, "annotations": annotations}))
+
+    assert kwargs["config"] == header["config"]
+    assert kwargs["description"] is None
+    pd.testing.assert_frame_equal(kwargs["predictions"], predictions)
+    pd.testing.assert_frame_equal(kwargs["annotations"], annotations)
+
+
+def test_round_trip_detection_dict_layout():
+    predictions, annotations = _detection()
+    prediction_table, _ = _to_long_format(predictions)
+    annotation_table, meta = _to_long_format(annotations)
+
+    kwargs = decode_request(encode_request({}, {
+        "predictions": prediction_table, "annotations": annotation_table, "annotations_meta": meta,
+    }))
+    decoded_predictions, decoded_annotations = detection_inputs_from_tables(
+        predictions=kwargs["predictions"], annotations=kwargs["annotations"], meta=kwargs["annotations_meta"],
+    )
+
+    for image_id in ("img_0", "img_1"):
+        pd.testing.assert_frame_equal(decoded_predictions[image_id], predictions[image_id])
+        pd.testing.assert_frame_equal(decoded_annotations[image_id], annotations[image_id])
+    pd.testing.assert_frame_equal(decoded_annotations["__meta__"], annotations["__meta__"])
+
+
+def test_round_trip_detection_long_format():
+    table = pd.DataFrame({"image_id": ["img_0", "img_0", "img_1"], "labels": ["person", "car", "car"]})
+    meta = pd.DataFrame({"image_id": ["img_0", "img_1"], "width": [640, 640], "height": [480, 480]})
+
+    kwargs = decode_request(encode_request({}, {"predictions": table, "annotations_meta": meta}))
+
+    pd.testing.assert_frame_equal(kwargs["predictions"], table)
+    pd.testing.assert_frame_equal(kwargs["annotations_meta"], meta)
+
+
+@pytest.mark.parametrize("error, status", [
+    (ValueError("x"), 400),
+    (KeyError("x"), 400),
+    (errors.LicenseInvalidError("x"), 403),
+    (errors.ThetisInternalError("x"), 500),
+    (MemoryError(), 500),
+])
+def test_error_status(error, status):
+    assert _error_status(error) == status
+
+
+@pytest.mark.parametrize("status, body, error_type, match", [
+    (400, {"error": "ValueError", "message": "bad labels"}, ValueError, "bad labels"),
+    (400, {"error": "KeyError", "message": "description"}, KeyError, "description"),
+    (403, {"error": "LicenseExpiredError", "message": "expired"}, RuntimeError, "LicenseExpiredError.*expired"),
+    (500, {"error": "ThetisInternalError", "message": "boom"}, RuntimeError, "ThetisInternalError.*500.*boom"),
+    (502, None, RuntimeError, "Unexpected response"),
+])
+def test_client_error_mapping(monkeypatch, status, body, error_type, match):
+    predictions, annotations = _classification()
+    payload = json.dumps(body).encode() if body is not None else b"<html>bad gateway</html>"
+    monkeypatch.setattr(ThetisClient, "_request", lambda self, method, path, body=None: (status, payload))
+
+    with pytest.raises(error_type, match=match):
+        ThetisClient().evaluate(config={}, predictions=predictions, annotations=annotations)
+
+
+def test_resolve_output_dir(tmp_path):
+    root = str(tmp_path)
+
+    assert _resolve_output_dir(None, None) is None
+    assert _resolve_output_dir("model/a", root) == os.path.join(os.path.realpath(root), "model", "a")
+
+    for output_dir in ("../outside", "/etc", ".", "a/../../outside"):
+        with pytest.raises(ValueError):
+            _resolve_output_dir(output_dir, root)
+
+    with pytest.raises(ValueError, match="output root"):
+        _resolve_output_dir("model", None)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module", params=["tcp", "unix"])
+def server(request):
+    directory = tempfile.mkdtemp(prefix="thetis-")
+    output_root = os.path.join(directory, "output")
+
+    if request.param == "tcp":
+        port = _free_port()
+        address, args = f"http://127.0.0.1:{port}", ["--port", str(port)]
+    else:
+        socket_path = os.path.join(directory, "thetis.sock")
+        address, args = f"unix://{socket_path}", ["--socket", socket_path]
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "thetis", "serve", "--workers", "2", "--output-root", output_root, *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    client = ThetisClient(address, timeout=30)
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            client.health()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("Evaluation server did not start.")
+            time.sleep(0.1)
+
+    yield client, output_root
+
+    process.terminate()
+    process.wait(timeout=30)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_health(server):
+    client, _ = server
+    assert client.health() == {"status": "ok", "workers": 2}
+
+
+def test_evaluate_classification(server, tmp_path):
+    client, output_root = server
+    predictions, annotations = _classification()
+
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("task_settings:\n  distinct_classes: [a, b]\n")
+
+    for _ in range(2):
+        result = client.evaluate(config=str(config_file), predictions=predictions, annotations=annotations,
+                                 output_dir="model_a")
+        assert result["performance"]["n_samples"] == 3
+
+    assert os.path.isfile(os.path.join(output_root, "model_a", "report.pdf"))
+
+
+def test_evaluate_detection(server):
+    client, _ = server
+    predictions, annotations = _detection()
+
+    result = client.evaluate(config={}, predictions=predictions, annotations=annotations)
+
+    assert result["performance"]["n_images"] == 2
+    assert result["performance"]["n_samples"] == 3
+
+
+@pytest.mark.parametrize("config, error_type, match", [
+    ({"raise": "ValueError"}, ValueError, "requested by test config"),
+    ({"raise": "ThetisInternalError"}, RuntimeError, "ThetisInternalError \\(status 500\\)"),
+])
+def test_evaluate_errors(server, config, error_type, match):
+    client, _ = server
+    predictions, annotations = _classification()
+
+    with pytest.raises(error_type, match=match):
+        client.evaluate(config=config, predictions=predictions, annotations=annotations)
+
+
+def test_evaluate_rejects_output_dir_outside_root(server):
+    client, _ = server
+    predictions, annotations = _classification()
+
+    with pytest.raises(ValueError, match="output root"):
+        client.evaluate(config={}, predictions=predictions, annotations=annotations, output_dir="../escape")
+
+
+SIGTERM_SCRIPT = """
+import os, signal, sys, threading, time
+from thetis import ThetisClient, serve
+
+def handler(signum, frame):
+    pass
+
+signal.signal(signal.SIGTERM, handler)
+
+def stop():
+    client = ThetisClient(f"http://127.0.0.1:{sys.argv[1]}", timeout=30)
+    while True:
+        try:
+            client.health()
+            break
+        except OSError:
+            time.sleep(0.1)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+threading.Thread(target=stop, daemon=True).start()
+serve(port=int(sys.argv[1]), workers=1)
+print(signal.getsignal(signal.SIGTERM) is handler)
+"""
+
+
+def test_serve_restores_sigterm_handler():
+    result = subprocess.run(
+        [sys.executable, "-c", SIGTERM_SCRIPT, str(_free_port())], capture_output=True, text=True, timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "True"
@@ -11,17 +11,85 @@ This is the API reference of the main entrance points for the Thetis toolbox.
 
    thetis
    thetis_mlflow
+   thetis_mlflow_async
+   thetis_batch
+   thetis_mlflow_batch
+   thetis_robustness
 
    read_json_with_pandas
+   read_json_lazy
    write_json_with_pandas
 
+   detection_inputs_from_tables
+   predictions_from_array
+   add_intersectional_attributes
+
+   ResultCache
+
+   serve
+   ThetisClient
+
 """
 
-from .io import read_json_with_pandas
-from .io import write_json_with_pandas
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .io import read_json_with_pandas
+    from .io import read_json_lazy
+    from .io import write_json_with_pandas
+
+    from .data import detection_inputs_from_tables
+    from .data import predictions_from_array
+    from .data import add_intersectional_attributes
+    from .cache import ResultCache
+    from .server import serve
+    from .server import ThetisClient
+
+    from .service import thetis
+    from .mlflow import thetis_mlflow
+    from .mlflow import thetis_mlflow_async
+    from .batch import thetis_batch
+    from .batch import thetis_mlflow_batch
+    from .robustness import thetis_robustness
+
+# public API is loaded on first access so that "import thetis" does not pull in thetiscore,
+# pandas or MLflow before they are actually needed (e.g., in short-lived batch workers)
+_LAZY_ATTRIBUTES = {
+    "read_json_with_pandas": ".io",
+    "read_json_lazy": ".io",
+    "write_json_with_pandas": ".io",
+    "detection_inputs_from_tables": ".data",
+    "predictions_from_array": ".data",
+    "add_intersectional_attributes": ".data",
+    "ResultCache": ".cache",
+    "serve": ".server",
+    "ThetisClient": ".server",
+    "thetis": ".service",
+    "thetis_mlflow": ".mlflow",
+    "thetis_mlflow_async": ".mlflow",
+    "thetis_batch": ".batch",
+    "thetis_mlflow_batch": ".batch",
+    "thetis_robustness": ".robustness",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES.keys())
+
+
+def __getattr__(attribute: str) -> Any:
+    if attribute not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{attribute}'")
+
+    module = importlib.import_module(_LAZY_ATTRIBUTES[attribute], __name__)
+    value = getattr(module, attribute)
+    globals()[attribute] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals().keys()) | set(__all__))
 
-from .service import thetis
-from .mlflow import thetis_mlflow
 
 name = "thetis"
 __version__ = "0.2.3"
@@ -0,0 +1,44 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+Command line interface of the Thetis evaluation toolkit.
+"""
+
+import argparse
+
+from .server import DEFAULT_HOST
+from .server import DEFAULT_PORT
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(prog="thetis", description="Thetis evaluation toolkit.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run a local evaluation server with pre-warmed workers")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--socket", default=None, help="listen on this Unix domain socket instead of host/port")
+    serve_parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU cores)")
+    serve_parser.add_argument("--license-file", default=None, help="path to an XML license file")
+    serve_parser.add_argument("--cache-dir", default=None, help="optional directory of a shared result cache")
+    serve_parser.add_argument("--output-root", default=None,
+                              help="directory below which clients may write PDF reports (default: not allowed)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        from .server import serve
+
+        serve(
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            workers=args.workers,
+            license_file_path=args.license_file,
+            cache_dir=args.cache_dir,
+            output_root=args.output_root,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides batched entry points for the Thetis evaluation toolkit to evaluate multiple models or
+checkpoints against a single set of annotations.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, Optional, Tuple, Dict, Any
+import pandas as pd
+
+from .data import META_KEY
+from .data import meta_frame
+from .data import split_detection_table
+from .cache import ResultCache
+
+
+# key of the predictions within files given as path, required for long-format tables as files hold a dictionary
+PREDICTIONS_KEY = "predictions"
+
+# evaluation state shared by all tasks of a worker process, set once by the pool initializer
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(state: Dict[str, Any]) -> None:
+    """ Pool initializer: receive annotations and common arguments once per worker process. """
+
+    _worker_state.clear()
+    _worker_state.update(state)
+
+
+def _load_predictions(predictions: Any) -> Any:
+    """
+    Load predictions given as path to a file written by 'write_json_with_pandas'. The file holds either the
+    predictions in dictionary layout or a dictionary {"predictions": <predictions>} (e.g., a long-format table).
+    """
+
+    if not isinstance(predictions, (str, os.PathLike)):
+        return predictions
+
+    from .io import read_json_with_pandas
+
+    content = read_json_with_pandas(predictions)
+    if isinstance(content, dict) and list(content.keys()) == [PREDICTIONS_KEY]:
+        return content[PREDICTIONS_KEY]
+
+    return content
+
+
+def _check_name(name: Any, output_dir: Optional[str]) -> None:
+    """ Names are used as subdirectory of 'output_dir' and must therefore not point outside of it. """
+
+    if output_dir is None:
+        return
+
+    if not isinstance(name, str) or name in ("", ".", "..") or "/" in name or "\\" in name \
+            or os.path.splitdrive(name)[0]:
+        raise ValueError(f"Invalid name {name!r}: must be a non-empty string without path separators.")
+
+
+def _evaluate(model_name: str, predictions: Any, state: Dict[str, Any]) -> Dict:
+    """ Evaluate the predictions of a single model with the shared annotations and arguments. """
+
+    # predictions loaded from a file may already be given in dictionary layout
+    predictions = _load_predictions(predictions)
+    if state["image_ids"] is not None and not isinstance(predictions, dict):
+        predictions = split_detection_table(predictions, image_ids=state["image_ids"], name="predictions")
+
+    kwargs = dict(state["kwargs"])
+    if kwargs.get("output_dir") is not None:
+        kwargs["output_dir"] = os.path.join(kwargs["output_dir"], model_name)
+
+    if state["mlflow"] is None:
+        from .service import thetis
+        return thetis(predictions=predictions, annotations=state["annotations"], **kwargs)
+
+    import mlflow
+    from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+    from .mlflow import thetis_mlflow
+
+    mlflow.set_tracking_uri(state["mlflow"]["tracking_uri"])
+    with mlflow.start_run(
+            run_name=model_name,
+            experiment_id=state["mlflow"]["experiment_id"],
+            nested=True,
+            tags={MLFLOW_PARENT_RUN_ID: state["mlflow"]["parent_run_id"]},
+    ):
+        return thetis_mlflow(predictions=predictions, annotations=state["annotations"], **kwargs)
+
+
+def _evaluate_in_worker(model_name: str, predictions: Any) -> Dict:
+    return _evaluate(model_name, predictions, _worker_state)
+
+
+def _prepare_state(
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame], Any],
+        annotations_meta: Optional[pd.DataFrame],
+        kwargs: Dict[str, Any],
+        mlflow_context: Optional[Dict[str, str]],
+) -> Dict[str, Any]:
+    """ Prepare the annotations once and bundle them with the common arguments as shared evaluation state. """
+
+    # annotations are converted only once; long-format predictions are split inside the workers
+    # so that only the compact tables need to be transferred to the worker processes
+    image_ids = None
+    if annotations_meta is not None:
+        meta = meta_frame(annotations_meta)
+        image_ids = meta.index
+        annotations = split_detection_table(annotations, image_ids=image_ids, name="annotations")
+        annotations[META_KEY] = meta
+
+    return {"annotations": annotations, "image_ids": image_ids, "kwargs": kwargs, "mlflow": mlflow_context}
+
+
+def _resolve_n_jobs(n_jobs: int) -> int:
+    n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+    if n_jobs < 1:
+        raise ValueError(f"'n_jobs' must be a positive integer or -1, got {n_jobs}.")
+
+    return n_jobs
+
+
+def _run_batch(
+        predictions: Dict[str, Any],
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame], Any],
+        annotations_meta: Optional[pd.DataFrame],
+        kwargs: Dict[str, Any],
+        mlflow_context: Optional[Dict[str, str]],
+        n_jobs: int,
+) -> Dict[str, Dict]:
+    """ Prepare the annotations once and evaluate all models sequentially or within a process pool. """
+
+    if not isinstance(predictions, dict):
+        raise TypeError("'predictions' must be a dict mapping model names to the predictions of each model.")
+
+    for name in predictions:
+        _check_name(name, kwargs.get("output_dir"))
+
+    state = _prepare_state(annotations, annotations_meta, kwargs, mlflow_context)
+    n_jobs = _resolve_n_jobs(n_jobs)
+
+    if n_jobs == 1 or len(predictions) <= 1:
+        return {name: _evaluate(name, model_predictions, state) for name, model_predictions in predictions.items()}
+
+    with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(predictions)),
+            initializer=_init_worker,
+            initargs=(state,),
+    ) as executor:
+        futures = {
+            name: executor.submit(_evaluate_in_worker, name, model_predictions)
+            for name, model_predictions in predictions.items()
+        }
+
+        return {name: future.result() for name, future in futures.items()}
+
+
+def thetis_batch(
+        *,
+        config: Union[str, os.PathLike, Dict],
+        predictions: Dict[str, Union[pd.DataFrame, Dict[str, pd.DataFrame]]],
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations_meta: Optional[pd.DataFrame] = None,
+        description: Dict[str, str] = None,
+        output_dir: Optional[str] = None,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        license_key_and_signature: Tuple[str, str] = None,
+        return_svg: Optional[bool] = False,
+        cache: Optional[ResultCache] = None,
+        n_jobs: int = 1,
+) -> Dict[str, Dict]:
+    """
+    Evaluate the predictions of multiple AI models (or checkpoints of a single model) against the same ground truth
+    dataset. The annotations are prepared only once and transferred only once to each worker process. Each model
+    is evaluated as described in :func:`thetis.thetis`; errors raised for a single model are propagated.
+
+    Note: You must provide one of the following arguments for license validation: `license_file_path`,
+    `license_xml_str`, or `license_key_and_signature`.
+
+    Args:
+        config: Application configuration options provided by the user.
+        predictions: Dictionary mapping a model name to the predictions made by the respective AI model. Each entry
+            must have the same format as the 'predictions' argument of :func:`thetis.thetis`, or be a path to a file
+            written by :func:`thetis.write_json_with_pandas`, which is then loaded within the worker process. The file
+            holds the predictions in dictionary layout or a dictionary {"predictions": <predictions>}, which is
+            required for long-format tables.
+        annotations: Ground truth data, see :func:`thetis.thetis`.
+        annotations_meta: Detection only: image meta information for long-format inputs, see :func:`thetis.thetis`.
+        description: dict containing a description of your AI solution, see :func:`thetis.thetis`.
+        output_dir: Path to the output directory. The PDF report of each model is stored within a subdirectory
+            named after the model. Default is None.
+        license_file_path: Path to an XML license file to run the application.
+        license_xml_str: String representation of an XML license file to run the application.
+        license_key_and_signature: Tuple of license key and signature strings.
+        return_svg: boolean flag which enables/disables returning Matplotlib (SVG) figures. Default is False.
+        cache: Optional :class:`thetis.ResultCache` instance, see :func:`thetis.thetis`.
+        n_jobs: Number of worker processes used to evaluate the models in parallel. Use -1 for all available CPU
+            cores. Default is 1 (sequential evaluation within the calling process).
+
+    Returns:
+        Dictionary mapping each model name to its evaluation results, rating scores, and recommendations.
+
+    Raises:
+        TypeError: if 'predictions' is not type dict.
+        ValueError: if 'output_dir' is given and a model name is not a string or contains a path separator.
+        ValueError: if 'n_jobs' is neither a positive integer nor -1.
+    """
+
+    kwargs = dict(
+        config=config,
+        description=description,
+        output_dir=output_dir,
+        license_file_path=license_file_path,
+        license_xml_str=license_xml_str,
+        license_key_and_signature=license_key_and_signature,
+        return_svg=return_svg,
+        cache=cache,
+    )
+
+    return _run_batch(predictions, annotations, annotations_meta, kwargs, mlflow_context=None, n_jobs=n_jobs)
+
+
+def thetis_mlflow_batch(
+        *,
+        config: Union[str, os.PathLike, Dict],
+        predictions: Dict[str, Union[pd.DataFrame, Dict[str, pd.DataFrame]]],
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations_meta: Optional[pd.DataFrame] = None,
+        description: Dict[str, str] = None,
+        mlflow_step: Optional[int] = None,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        license_key_and_signature: Tuple[str, str] = None,
+        n_jobs: int = 1,
+) -> Dict[str, Dict]:
+    """
+    Evaluate the predictions of multiple AI models (or checkpoints of a single model) against the same ground truth
+    dataset with added MLflow logging support. Each model is evaluated as described in :func:`thetis.thetis_mlflow`
+    and logged to its own MLflow run, named after the model and nested below the currently active run.
+    Errors raised for a single model are propagated.
+
+    Note: this function must be called within an active MLflow run.
+
+    Args:
+        config: Application configuration options provided by the user.
+        predictions: Dictionary mapping a model name to the predictions made by the respective AI model. Each entry
+            must have the same format as the 'predictions' argument of :func:`thetis.thetis_mlflow`, or be a path to a
+            file written by :func:`thetis.write_json_with_pandas`, which is then loaded within the worker process. The
+            file holds the predictions in dictionary layout or a dictionary {"predictions": <predictions>}, which is
+            required for long-format tables.
+        annotations: Ground truth data, see :func:`thetis.thetis_mlflow`.
+        annotations_meta: Detection only: image meta information for long-format inputs, see :func:`thetis.thetis`.
+        description: dict containing a description of your AI solution, see :func:`thetis.thetis_mlflow`.
+        mlflow_step: Optional integer with the current step count passed to MLflow for each model.
+        license_file_path: Path to an XML license file to run the application.
+        license_xml_str: String representation of an XML license file to run the application.
+        license_key_and_signature: Tuple of license key and signature strings.
+        n_jobs: Number of worker processes used to evaluate the models in parallel. Use -1 for all available CPU
+            cores. Default is 1 (sequential evaluation within the calling process).
+
+    Returns:
+        Dictionary mapping each model name to its evaluation results, rating scores, and recommendations.
+
+    Raises:
+        RuntimeError: if no MLflow run is active.
+        TypeError: if 'predictions' is not type dict.
+        ValueError: if 'n_jobs' is neither a positive integer nor -1.
+    """
+
+    import mlflow
+
+    parent = mlflow.active_run()
+    if parent is None:
+        raise RuntimeError("'thetis_mlflow_batch' must be called within an active MLflow run.")
+
+    # the tracking URI and the parent run are passed explicitly as worker processes do not share the MLflow state
+    mlflow_context = {
+        "tracking_uri": mlflow.get_tracking_uri(),
+        "experiment_id": parent.info.experiment_id,
+        "parent_run_id": parent.info.run_id,
+    }
+
+    kwargs = dict(
+        config=config,
+        description=description,
+        mlflow_step=mlflow_step,
+        license_file_path=license_file_path,
+        license_xml_str=license_xml_str,
+        license_key_and_signature=license_key_and_signature,
+    )
+
+    return _run_batch(predictions, annotations, annotations_meta, kwargs, mlflow_context=mlflow_context, n_jobs=n_jobs)
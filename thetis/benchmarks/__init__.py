@@ -0,0 +1,28 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+Benchmark suite of Thetis
+=========================
+
+Deterministic synthetic data generators for all tasks and a harness to measure the runtime and memory consumption
+of the Thetis evaluation toolkit. The suite can also be run from the command line via
+:code:`python -m thetis.benchmarks --help`.
+
+.. autosummary::
+   :toctree: _autosummary
+
+   make_classification
+   make_regression
+   make_detection
+   make_detection_tables
+
+   run_benchmark
+
+"""
+
+from .generators import make_classification
+from .generators import make_regression
+from .generators import make_detection
+from .generators import make_detection_tables
+
+from .harness import run_benchmark
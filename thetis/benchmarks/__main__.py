@@ -0,0 +1,48 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+Command line interface of the Thetis benchmark suite.
+"""
+
+import argparse
+
+from .harness import TASKS
+from .harness import ASPECTS
+from .harness import run_benchmark
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        prog="python -m thetis.benchmarks",
+        description="Measure runtime, memory and throughput of Thetis on synthetic datasets.",
+    )
+    parser.add_argument("--tasks", nargs="+", default=list(TASKS), choices=TASKS)
+    parser.add_argument("--aspects", nargs="+", default=list(ASPECTS), choices=ASPECTS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=None,
+                        help="number of samples (number of images for detection); "
+                             "default: task-specific sizes up to 10M samples and 100k images")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-isolate", action="store_true", help="run all measurements within this process")
+    parser.add_argument("--license-file", default=None, help="path to an XML license file")
+    parser.add_argument("--output", default=None, help="optional CSV file to store the results")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        tasks=args.tasks,
+        aspects=args.aspects,
+        sizes=args.sizes,
+        repeat=args.repeat,
+        seed=args.seed,
+        isolate=not args.no_isolate,
+        license_file_path=args.license_file,
+    )
+
+    print(results.to_string(index=False))
+    if args.output is not None:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides deterministic generators for synthetic evaluation datasets that follow the input data format
+of the Thetis evaluation toolkit for classification, regression and object detection.
+"""
+
+from typing import Optional, Tuple, Dict, Sequence
+import numpy as np
+import pandas as pd
+
+from ..data import detection_inputs_from_tables
+
+
+DEFAULT_SENSITIVE_ATTRIBUTES = {
+    "gender": ["female", "male"],
+    "age": ["child", "adult", "senior"],
+}
+
+IMAGE_SIZES = np.array([[1920, 1080], [1280, 720], [1680, 720]])
+
+
+def _config(task: str, sensitive_attributes: Dict[str, Sequence[str]], **task_settings) -> Dict:
+    """ Build an application config with all evaluation aspects enabled. """
+
+    return {
+        "meta": {
+            "model": {"name": "Synthetic model", "revision": "r1"},
+            "dataset": {"name": f"Synthetic {task} dataset", "revision": "r1"},
+        },
+        "task": task,
+        "language": "en",
+        "task_settings": task_settings,
+        "data_evaluation": {"examine": True},
+        "performance": {"examine": True},
+        "uncertainty": {"examine": True, "ece_bins": 20, "ece_sample_threshold": 10, "dece_bins": 5},
+        "fairness": {
+            "examine": len(sensitive_attributes) > 0,
+            "sensitive_attributes": {name: "all" for name in sensitive_attributes},
+        },
+    }
+
+
+def _sensitive_columns(
+        rng: np.random.Generator,
+        n_samples: int,
+        sensitive_attributes: Dict[str, Sequence[str]],
+) -> Dict[str, np.ndarray]:
+    """ Draw a uniformly distributed label for each sample and sensitive attribute. """
+
+    return {
+        name: np.asarray(values, dtype=object)[rng.integers(len(values), size=n_samples)]
+        for name, values in sensitive_attributes.items()
+    }
+
+
+def make_classification(
+        n_samples: int,
+        *,
+        n_classes: int = 2,
+        sensitive_attributes: Optional[Dict[str, Sequence[str]]] = None,
+        seed: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """
+    Generate a synthetic binary or multi-class classification dataset. The confidence estimates are drawn from a
+    softmax over noisy logits that favor the true class, so the resulting model is informative but imperfect.
+
+    Args:
+        n_samples: Number of samples.
+        n_classes: Number of distinct classes. For 2 classes, a binary dataset with a single "confidence" column
+            (w.r.t. the positive label "class_1") is created, otherwise one "confidence_<label>" column per class.
+        sensitive_attributes: Dictionary mapping the name of each sensitive attribute to its possible labels.
+            Default is :code:`DEFAULT_SENSITIVE_ATTRIBUTES` (gender and age).
+        seed: Seed of the random number generator.
+
+    Returns:
+        Tuple with predictions, annotations and an application config dictionary.
+
+    Raises:
+        ValueError: if 'n_classes' is lower than 2.
+    """
+
+    if n_classes < 2:
+        raise ValueError(f"'n_classes' must be at least 2, got {n_classes}.")
+
+    if sensitive_attributes is None:
+        sensitive_attributes = DEFAULT_SENSITIVE_ATTRIBUTES
+
+    rng = np.random.default_rng(seed)
+    classes = np.array([f"class_{i}" for i in range(n_classes)], dtype=object)
+    index = pd.RangeIndex(n_samples)
+
+    target = rng.integers(n_classes, size=n_samples)
+    logits = rng.normal(scale=1.5, size=(n_samples, n_classes))
+    logits[np.arange(n_samples), target] += 2.0
+    confidence = np.exp(logits - logits.max(axis=1, keepdims=True))
+    confidence /= confidence.sum(axis=1, keepdims=True)
+
+    annotations = pd.DataFrame(
+        {"target": classes[target], **_sensitive_columns(rng, n_samples, sensitive_attributes)},
+        index=index,
+    )
+
+    predictions = {"labels": classes[confidence.argmax(axis=1)]}
+    if n_classes == 2:
+        predictions["confidence"] = confidence[:, 1]
+    else:
+        predictions.update({f"confidence_{label}": confidence[:, i] for i, label in enumerate(classes)})
+
+    predictions = pd.DataFrame(predictions, index=index)
+
+    task_settings = {"distinct_classes": classes.tolist()}
+    if n_classes == 2:
+        task_settings["binary_positive_label"] = classes[1]
+
+    return predictions, annotations, _config("classification", sensitive_attributes, **task_settings)
+
+
+def make_regression(
+        n_samples: int,
+        *,
+        uncertainty: str = "stddev",
+        sensitive_attributes: Optional[Dict[str, Sequence[str]]] = None,
+        seed: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """
+    Generate a synthetic regression dataset with heteroscedastic noise. The estimated uncertainty matches the
+    true noise level, so the predictions are well calibrated.
+
+    Args:
+        n_samples: Number of samples.
+        uncertainty: Name of the uncertainty column. Must be one of "stddev", "variance".
+        sensitive_attributes: Dictionary mapping the name of each sensitive attribute to its possible labels.
+            Default is :code:`DEFAULT_SENSITIVE_ATTRIBUTES` (gender and age).
+        seed: Seed of the random number generator.
+
+    Returns:
+        Tuple with predictions, annotations and an application config dictionary.
+
+    Raises:
+        ValueError: if 'uncertainty' is not one of "stddev", "variance".
+    """
+
+    if uncertainty not in ("stddev", "variance"):
+        raise ValueError(f"'uncertainty' must be one of 'stddev', 'variance', got '{uncertainty}'.")
+
+    if sensitive_attributes is None:
+        sensitive_attributes = DEFAULT_SENSITIVE_ATTRIBUTES
+
+    rng = np.random.default_rng(seed)
+    index = pd.RangeIndex(n_samples)
+
+    target = rng.normal(loc=5., scale=10., size=n_samples)
+    stddev = rng.uniform(0.5, 3., size=n_samples)
+    prediction = target + rng.normal(size=n_samples) * stddev
+
+    annotations = pd.DataFrame(
+        {"target": target, **_sensitive_columns(rng, n_samples, sensitive_attributes)},
+        index=index,
+    )
+
+    predictions = pd.DataFrame(
+        {"predictions": prediction, uncertainty: stddev if uncertainty == "stddev" else np.square(stddev)},
+        index=index,
+    )
+
+    return predictions, annotations, _config("regression", sensitive_attributes)
+
+
+def make_detection_tables(
+        n_images: int,
+        *,
+        n_classes: int = 2,
+        boxes_per_image: Tuple[int, int] = (3, 10),
+        sensitive_attributes: Optional[Dict[str, Sequence[str]]] = None,
+        seed: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, Dict]:
+    """
+    Generate a synthetic object detection dataset with bounding boxes in "xyxy" format as long-format tables
+    with an "image_id" column (see 'annotations_meta' of :func:`thetis.thetis`). Each ground truth object is
+    detected with a probability of 80% and a jittered bounding box; additionally, false positive detections with
+    low confidence are added.
+
+    Args:
+        n_images: Number of images.
+        n_classes: Number of distinct classes.
+        boxes_per_image: Minimum and maximum number of ground truth objects per image.
+        sensitive_attributes: Dictionary mapping the name of each sensitive attribute to its possible labels.
+            Default is :code:`DEFAULT_SENSITIVE_ATTRIBUTES` (gender and age).
+        seed: Seed of the random number generator.
+
+    Returns:
+        Tuple with predictions, annotations, image meta information and an application config dictionary.
+    """
+
+    if sensitive_attributes is None:
+        sensitive_attributes = DEFAULT_SENSITIVE_ATTRIBUTES
+
+    rng = np.random.default_rng(seed)
+    classes = np.array([f"class_{i}" for i in range(n_classes)], dtype=object)
+    image_ids = np.array([f"img_{i:08d}" for i in range(n_images)], dtype=object)
+    image_sizes = IMAGE_SIZES[rng.integers(len(IMAGE_SIZES), size=n_images)].astype(float)
+
+    # ground truth objects for all images at once, the image of each object is given by its image index
+    n_targets = rng.integers(boxes_per_image[0], boxes_per_image[1] + 1, size=n_images)
+    target_image = np.repeat(np.arange(n_images), n_targets)
+    n_total = len(target_image)
+    width, height = image_sizes[target_image, 0], image_sizes[target_image, 1]
+    box_w, box_h = rng.uniform(0.02, 0.3, size=n_total) * width, rng.uniform(0.02, 0.3, size=n_total) * height
+    xmin = rng.uniform(0., 1., size=n_total) * (width - box_w)
+    ymin = rng.uniform(0., 1., size=n_total) * (height - box_h)
+    target_cls = rng.integers(n_classes, size=n_total)
+
+    annotations = pd.DataFrame({
+        "image_id": image_ids[target_image],
+        "target": classes[target_cls],
+        "xmin": xmin, "ymin": ymin, "xmax": xmin + box_w, "ymax": ymin + box_h,
+        **_sensitive_columns(rng, n_total, sensitive_attributes),
+    })
+
+    # true positive detections with jittered boxes and false positives with low confidence
+    detected = rng.uniform(size=n_total) < 0.8
+    jitter = rng.normal(scale=0.05, size=(n_total, 4)) * np.stack([box_w, box_h, box_w, box_h], axis=1)
+    n_false = rng.integers(0, 3, size=n_images)
+    false_image = np.repeat(np.arange(n_images), n_false)
+    false_w = rng.uniform(0.02, 0.2, size=len(false_image)) * image_sizes[false_image, 0]
+    false_h = rng.uniform(0.02, 0.2, size=len(false_image)) * image_sizes[false_image, 1]
+    false_x = rng.uniform(size=len(false_image)) * (image_sizes[false_image, 0] - false_w)
+    false_y = rng.uniform(size=len(false_image)) * (image_sizes[false_image, 1] - false_h)
+
+    pred_image = np.concatenate([target_image[detected], false_image])
+    pred_xmin = np.concatenate([xmin[detected] + jitter[detected, 0], false_x])
+    pred_ymin = np.concatenate([ymin[detected] + jitter[detected, 1], false_y])
+    pred_xmax = np.concatenate([xmin[detected] + box_w[detected] + jitter[detected, 2], false_x + false_w])
+    pred_ymax = np.concatenate([ymin[detected] + box_h[detected] + jitter[detected, 3], false_y + false_h])
+    pred_cls = np.concatenate([target_cls[detected], rng.integers(n_classes, size=len(false_image))])
+    confidence = np.concatenate([
+        rng.beta(5., 2., size=int(detected.sum())),
+        rng.beta(2., 5., size=len(false_image)),
+    ])
+
+    order = np.argsort(pred_image, kind="stable")
+    predictions = pd.DataFrame({
+        "image_id": image_ids[pred_image[order]],
+        "labels": classes[pred_cls[order]],
+        "confidence": confidence[order],
+        "xmin": np.clip(pred_xmin[order], 0., image_sizes[pred_image[order], 0]),
+        "ymin": np.clip(pred_ymin[order], 0., image_sizes[pred_image[order], 1]),
+        "xmax": np.clip(pred_xmax[order], 0., image_sizes[pred_image[order], 0]),
+        "ymax": np.clip(pred_ymax[order], 0., image_sizes[pred_image[order], 1]),
+    })
+
+    meta = pd.DataFrame({"width": image_sizes[:, 0], "height": image_sizes[:, 1]}, index=image_ids)
+
+    config = _config(
+        "detection",
+        sensitive_attributes,
+        distinct_classes=classes.tolist(),
+        detection_bbox_format="xyxy",
+        detection_bbox_ious=[0.5, 0.75],
+        detection_bbox_matching="exclusive",
+        detection_bbox_probabilistic=False,
+        detection_confidence_thr=0.2,
+    )
+
+    return predictions, annotations, meta, config
+
+
+def make_detection(
+        n_images: int,
+        *,
+        n_classes: int = 2,
+        boxes_per_image: Tuple[int, int] = (3, 10),
+        sensitive_attributes: Optional[Dict[str, Sequence[str]]] = None,
+        seed: int = 0,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict]:
+    """
+    Generate a synthetic object detection dataset in the dictionary layout with one pd.DataFrame per image and the
+    "__meta__" field within the annotations. See :func:`make_detection_tables` for details.
+
+    Args:
+        n_images: Number of images.
+        n_classes: Number of distinct classes.
+        boxes_per_image: Minimum and maximum number of ground truth objects per image.
+        sensitive_attributes: Dictionary mapping the name of each sensitive attribute to its possible labels.
+            Default is :code:`DEFAULT_SENSITIVE_ATTRIBUTES` (gender and age).
+        seed: Seed of the random number generator.
+
+    Returns:
+        Tuple with predictions, annotations and an application config dictionary.
+    """
+
+    predictions, annotations, meta, config = make_detection_tables(
+        n_images,
+        n_classes=n_classes,
+        boxes_per_image=boxes_per_image,
+        sensitive_attributes=sensitive_attributes,
+        seed=seed,
+    )
+
+    predictions, annotations = detection_inputs_from_tables(predictions=predictions, annotations=annotations, meta=meta)
+
+    return predictions, annotations, config
@@ -0,0 +1,146 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides a benchmark harness that measures wall time, CPU time, peak memory and throughput of the
+Thetis evaluation toolkit on synthetic datasets for each task and evaluation aspect.
+"""
+
+import os
+import time
+import copy
+import multiprocessing
+from typing import Union, Optional, Tuple, Dict, Sequence, Any
+import pandas as pd
+
+from .generators import make_classification
+from .generators import make_regression
+from .generators import make_detection
+from ..profiling import _peak_rss_mb
+
+
+TASKS = ("binary", "multiclass", "regression", "detection")
+ASPECTS = ("performance", "uncertainty", "fairness", "data_evaluation")
+
+# default dataset sizes per task; for detection, the size is the number of images (about 6.5 boxes per image)
+DEFAULT_SIZES = {
+    "binary": (1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+    "multiclass": (1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+    "regression": (1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+    "detection": (100, 1_000, 10_000, 100_000),
+}
+
+
+def _generate(task: str, size: int, seed: int) -> Tuple[Any, Any, Dict]:
+    """ Generate a synthetic dataset for a benchmark task. For detection, 'size' is the number of images. """
+
+    if task == "binary":
+        return make_classification(size, n_classes=2, seed=seed)
+    if task == "multiclass":
+        return make_classification(size, n_classes=10, seed=seed)
+    if task == "regression":
+        return make_regression(size, seed=seed)
+    if task == "detection":
+        return make_detection(size, seed=seed)
+
+    raise ValueError(f"Unknown benchmark task '{task}'. Must be one of {TASKS}.")
+
+
+def _measure(task: str, aspect: str, size: int, seed: int, license_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """ Run a single evaluation for one aspect and measure its resource consumption. """
+
+    from ..service import thetis
+
+    predictions, annotations, config = _generate(task, size, seed)
+
+    config = copy.deepcopy(config)
+    for name in ASPECTS:
+        config[name]["examine"] = name == aspect
+
+    rss_inputs = _peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    thetis(config=config, predictions=predictions, annotations=annotations, **license_kwargs)
+    wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    return {
+        "task": task,
+        "aspect": aspect,
+        "size": size,
+        "wall_time_s": wall_time,
+        "cpu_time_s": cpu_time,
+        "throughput_per_s": size / wall_time if wall_time > 0 else float("inf"),
+        "peak_rss_inputs_mb": rss_inputs,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_benchmark(
+        *,
+        tasks: Sequence[str] = TASKS,
+        aspects: Sequence[str] = ASPECTS,
+        sizes: Optional[Sequence[int]] = None,
+        repeat: int = 1,
+        seed: int = 0,
+        isolate: bool = True,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        license_key_and_signature: Tuple[str, str] = None,
+) -> pd.DataFrame:
+    """
+    Benchmark the Thetis evaluation toolkit on synthetic datasets. For each task, size and aspect, an evaluation
+    with only this aspect enabled is run and its wall time, CPU time, peak memory and throughput are recorded.
+    The throughput is given in samples per second (images per second for detection).
+
+    Note: a valid license for the benchmarked tasks is required. If no license argument is given, the license is
+    resolved as in :func:`thetis.thetis` (e.g., via environment variable THETIS_LICENSE).
+
+    Args:
+        tasks: Benchmark tasks out of "binary", "multiclass" (10 classes), "regression", "detection".
+        aspects: Evaluation aspects out of "performance", "uncertainty", "fairness", "data_evaluation".
+        sizes: Dataset sizes given as number of samples (number of images for detection). Default is None
+            (the task-specific sizes of :code:`DEFAULT_SIZES`, i.e., up to 10M samples for classification and
+            regression and up to 100k images for detection).
+        repeat: Number of repetitions for each measurement.
+        seed: Seed for the synthetic data generators.
+        isolate: If True, each measurement runs in a fresh process so that the peak memory is not affected by
+            previous runs. Default is True.
+        license_file_path: Path to an XML license file to run the application.
+        license_xml_str: String representation of an XML license file to run the application.
+        license_key_and_signature: Tuple of license key and signature strings.
+
+    Returns:
+        pd.DataFrame with one row per measurement and columns "task", "aspect", "size", "wall_time_s",
+        "cpu_time_s", "throughput_per_s", "peak_rss_inputs_mb" (peak memory after generating the inputs) and
+        "peak_rss_mb" (peak memory after the evaluation). Peak memory values are only reliable for isolated runs.
+
+    Raises:
+        ValueError: if an unknown task or aspect is requested.
+    """
+
+    for task in tasks:
+        if task not in TASKS:
+            raise ValueError(f"Unknown benchmark task '{task}'. Must be one of {TASKS}.")
+
+    for aspect in aspects:
+        if aspect not in ASPECTS:
+            raise ValueError(f"Unknown evaluation aspect '{aspect}'. Must be one of {ASPECTS}.")
+
+    license_kwargs = dict(
+        license_file_path=license_file_path,
+        license_xml_str=license_xml_str,
+        license_key_and_signature=license_key_and_signature,
+    )
+
+    context = multiprocessing.get_context("spawn")
+    records = []
+    for task in tasks:
+        for size in (DEFAULT_SIZES[task] if sizes is None else sizes):
+            for aspect in aspects:
+                for _ in range(repeat):
+                    args = (task, aspect, size, seed, license_kwargs)
+                    if isolate:
+                        with context.Pool(processes=1) as pool:
+                            records.append(pool.apply(_measure, args))
+                    else:
+                        records.append(_measure(*args))
+
+    return pd.DataFrame.from_records(records)
@@ -0,0 +1,379 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides an on-disk cache for Thetis evaluation results. Entries are keyed by a content hash of the
+normalized configuration, the input data and the package versions, and are evicted in least-recently-used order
+once the cache exceeds its size limit.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from importlib import metadata
+from typing import Union, Optional, Tuple, Dict, Callable, Any
+import pandas as pd
+
+from .io import read_json_with_pandas
+from .io import write_json_with_pandas
+
+
+RESULT_FILENAME = "result.json"
+ARTIFACTS_DIRNAME = "artifacts"
+
+# directory holding one file per license fingerprint, modified whenever thetiscore has accepted the license
+LICENSES_DIRNAME = ".licenses"
+
+# cached results are only served for licenses that thetiscore has accepted within this interval (in seconds)
+LICENSE_CHECK_INTERVAL = 3600.
+
+
+def license_fingerprint(
+        *,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        license_key_and_signature: Tuple[str, str] = None,
+) -> str:
+    """
+    Fingerprint of the license arguments of an evaluation (including the license file modification time and the
+    THETIS_LICENSE environment variable), used to track which licenses have recently been verified by thetiscore.
+    """
+
+    license_file_mtime = None
+    if license_file_path is not None and os.path.isfile(license_file_path):
+        license_file_mtime = os.stat(license_file_path).st_mtime_ns
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps([
+        os.fspath(license_file_path) if license_file_path is not None else None,
+        license_file_mtime,
+        license_xml_str,
+        list(license_key_and_signature) if license_key_and_signature is not None else None,
+        os.environ.get("THETIS_LICENSE"),
+        os.getcwd(),
+    ]).encode())
+
+    return digest.hexdigest()
+
+
+def _package_versions() -> str:
+    """ Version string of this package and thetiscore, as both influence the evaluation results. """
+
+    from . import __version__
+
+    try:
+        core_version = metadata.version("thetiscore")
+    except metadata.PackageNotFoundError:
+        core_version = "unknown"
+
+    return f"thetis={__version__};thetiscore={core_version}"
+
+
+def _normalize_config(config: Union[str, os.PathLike, Dict]) -> str:
+    """ Stable string representation of the configuration, independent of key order and YAML formatting. """
+
+    if isinstance(config, (str, os.PathLike)):
+        with open(config, "rb") as f:
+            content = f.read()
+
+        try:
+            import yaml
+        except ImportError:
+            return content.decode("utf-8", errors="replace")
+
+        config = yaml.safe_load(content)
+
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+def _update_hash(digest: Any, obj: Any) -> None:
+    """ Feed the content of a (possibly nested) input object into the given hash object. """
+
+    if obj is None:
+        digest.update(b"N")
+
+    elif isinstance(obj, pd.DataFrame):
+        digest.update(b"D")
+        digest.update(json.dumps([str(c) for c in obj.columns]).encode())
+        digest.update(json.dumps([str(t) for t in obj.dtypes]).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+
+    elif isinstance(obj, dict):
+        digest.update(b"M")
+        for key in sorted(obj.keys(), key=str):
+            digest.update(repr(key).encode())
+            _update_hash(digest, obj[key])
+
+    else:
+        digest.update(b"O")
+        digest.update(json.dumps(obj, sort_keys=True, default=str).encode())
+
+
+def _directory_size(path: str) -> int:
+    """ Total size of all files below a directory in bytes. """
+
+    size = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            size += os.path.getsize(os.path.join(root, filename))
+
+    return size
+
+
+def _snapshot(directory: Optional[str]) -> Dict[str, int]:
+    """ Map the relative path of each file below a directory to its modification time. """
+
+    if directory is None or not os.path.isdir(directory):
+        return {}
+
+    result = {}
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            path = os.path.join(root, filename)
+            result[os.path.relpath(path, directory)] = os.stat(path).st_mtime_ns
+
+    return result
+
+
+class ResultCache(object):
+    """
+    On-disk cache for Thetis evaluation results. Each entry holds the result dictionary as well as all artifacts
+    (e.g., the PDF report) that have been written to the output directory during the evaluation. A cache hit
+    restores these artifacts to the requested output directory.
+
+    The cache is bounded by 'max_size' bytes. When exceeded, the least recently used entries are evicted.
+
+    Cached results are only returned for licenses that have been verified by thetiscore: each evaluation by
+    thetiscore verifies the license and records this within the cache directory, and cached results are served to
+    all processes using the same cache directory and license arguments for 'LICENSE_CHECK_INTERVAL' seconds (one
+    hour) afterwards. Once the interval has passed, the next evaluation is computed by thetiscore again. Note that
+    the license arguments include the modification time of the license file: if the license file is written anew
+    for each run (e.g., by CI jobs), use 'skip_license_check' to obtain cache hits.
+
+    Note: results are only cached when 'return_svg' is disabled, as Matplotlib figures cannot be serialized.
+
+    Args:
+        directory: Path to the cache directory. Created if it does not exist.
+        max_size: Maximum size of the cache in bytes. Default is 1 GiB.
+        skip_license_check: If True, cached results are returned without a recent license verification (e.g., for
+            CI jobs or offline reproduction of results). Default is False.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike], max_size: int = 1 << 30, skip_license_check: bool = False):
+
+        self.directory = os.fspath(directory)
+        self.max_size = int(max_size)
+        self.skip_license_check = skip_license_check
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(
+            self,
+            *,
+            config: Union[str, os.PathLike, Dict],
+            predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+            annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+            **kwargs: Any,
+    ) -> str:
+        """
+        Compute the cache key for an evaluation.
+
+        Args:
+            config: Application configuration options provided by the user (dict or path to YAML file).
+            predictions: Predictions made by the AI model.
+            annotations: Ground truth data.
+            **kwargs: Further JSON-serializable or pd.DataFrame arguments that influence the result.
+
+        Returns:
+            Hexadecimal content hash.
+
+        Raises:
+            FileNotFoundError: if config is given as file path but no appropriate file can be found.
+        """
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(_package_versions().encode())
+        digest.update(_normalize_config(config).encode())
+        _update_hash(digest, predictions)
+        _update_hash(digest, annotations)
+        _update_hash(digest, kwargs)
+
+        return digest.hexdigest()
+
+    def get(self, key: str, *, output_dir: Optional[str] = None) -> Optional[Dict]:
+        """
+        Look up a cache entry. On a hit, the stored artifacts are copied to 'output_dir' (if given).
+
+        Args:
+            key: Cache key obtained by :meth:`key`.
+            output_dir: Output directory to restore the stored artifacts to.
+
+        Returns:
+            The stored result dictionary or None if no entry exists for the given key. If 'output_dir' is given but
+            the entry has been stored without an output directory (i.e., without artifacts), None is returned as well.
+        """
+
+        entry = os.path.join(self.directory, key)
+        result_file = os.path.join(entry, RESULT_FILENAME)
+        if not os.path.isfile(result_file):
+            return None
+
+        artifacts = os.path.join(entry, ARTIFACTS_DIRNAME)
+        if output_dir is not None:
+            if not os.path.isdir(artifacts):
+                return None
+
+            shutil.copytree(artifacts, output_dir, dirs_exist_ok=True)
+
+        result = read_json_with_pandas(result_file)
+
+        # mark as recently used for the LRU eviction
+        os.utime(entry)
+
+        return result
+
+    def put(
+            self,
+            key: str,
+            result: Dict,
+            *,
+            output_dir: Optional[str] = None,
+            before: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        Store an evaluation result and evict least recently used entries if the size limit is exceeded.
+
+        Args:
+            key: Cache key obtained by :meth:`key`.
+            result: The result dictionary of the evaluation.
+            output_dir: Output directory of the evaluation. New or modified files are stored as artifacts.
+            before: Snapshot of 'output_dir' taken before the evaluation. If None, all files are stored.
+        """
+
+        entry = os.path.join(self.directory, key)
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            write_json_with_pandas(json_like=result, filename=os.path.join(staging, RESULT_FILENAME))
+
+            # an (empty) artifacts directory marks entries that have been stored with an output directory
+            if output_dir is not None:
+                os.makedirs(os.path.join(staging, ARTIFACTS_DIRNAME), exist_ok=True)
+
+            before = before or {}
+            for relpath, mtime in _snapshot(output_dir).items():
+                if before.get(relpath) == mtime:
+                    continue
+
+                target = os.path.join(staging, ARTIFACTS_DIRNAME, relpath)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(os.path.join(output_dir, relpath), target)
+
+            # concurrent writers for the same key produce identical entries, so the first one wins;
+            # only an existing entry without artifacts is replaced by an entry with artifacts
+            if os.path.isdir(entry) and output_dir is not None \
+                    and not os.path.isdir(os.path.join(entry, ARTIFACTS_DIRNAME)):
+                shutil.rmtree(entry, ignore_errors=True)
+
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.evict()
+
+    def _license_file(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, LICENSES_DIRNAME, fingerprint)
+
+    def _license_verified(self, fingerprint: Optional[str]) -> bool:
+        """ True if the license given by 'fingerprint' has been verified within 'LICENSE_CHECK_INTERVAL' seconds. """
+
+        if fingerprint is None:
+            return False
+
+        try:
+            verified_at = os.stat(self._license_file(fingerprint)).st_mtime
+        except OSError:
+            return False
+
+        return time.time() - verified_at < LICENSE_CHECK_INTERVAL
+
+    def _mark_license_verified(self, fingerprint: str) -> None:
+        """ Record that thetiscore has just verified the license given by 'fingerprint'. """
+
+        path = self._license_file(fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a"):
+            pass
+
+        os.utime(path)
+
+    def get_or_compute(
+            self,
+            key: str,
+            compute: Callable[[], Dict],
+            *,
+            output_dir: Optional[str] = None,
+            license_fingerprint: Optional[str] = None,
+    ) -> Dict:
+        """
+        Return the cached result for 'key' or run 'compute' and store its result. A cached result is only returned
+        if the license given by 'license_fingerprint' has been verified by 'compute' within the last
+        'LICENSE_CHECK_INTERVAL' seconds (or if 'skip_license_check' is set).
+
+        Args:
+            key: Cache key obtained by :meth:`key`.
+            compute: Function without arguments that runs the evaluation by thetiscore (verifying the license).
+            output_dir: Output directory of the evaluation.
+            license_fingerprint: Fingerprint of the license arguments obtained by
+                :func:`thetis.cache.license_fingerprint`. If None, cached results are only returned if
+                'skip_license_check' is set.
+
+        Returns:
+            The (cached) result dictionary.
+        """
+
+        if self.skip_license_check or self._license_verified(license_fingerprint):
+            result = self.get(key, output_dir=output_dir)
+            if result is not None:
+                return result
+
+        before = _snapshot(output_dir)
+        result = compute()
+        if license_fingerprint is not None:
+            self._mark_license_verified(license_fingerprint)
+
+        self.put(key, result, output_dir=output_dir, before=before)
+
+        return result
+
+    def evict(self) -> None:
+        """ Remove least recently used entries until the cache size is within 'max_size'. """
+
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+
+            entries.append((os.stat(path).st_mtime_ns, _directory_size(path), path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """ Remove all cache entries. """
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,414 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides helper functions to convert alternative input data layouts into the input format expected by
+the Thetis evaluation toolkit.
+"""
+
+import os
+import copy
+from typing import Union, Optional, Tuple, Dict, Hashable, Sequence, Any
+import numpy as np
+import pandas as pd
+
+
+IMAGE_ID_COLUMN = "image_id"
+META_KEY = "__meta__"
+
+
+def _to_pandas(table: Any, name: str) -> pd.DataFrame:
+    """
+    Return the given table as pd.DataFrame. Arrow tables and record batches are converted, pd.DataFrame instances
+    are returned as they are.
+    """
+
+    if isinstance(table, pd.DataFrame):
+        return table
+
+    # Arrow is an optional dependency, only required if Arrow tables are actually passed
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None
+
+    if pa is not None and isinstance(table, (pa.Table, pa.RecordBatch)):
+        return table.to_pandas()
+
+    raise TypeError(f"'{name}' must be of type pd.DataFrame or pyarrow.Table, got {type(table).__name__}.")
+
+
+def split_detection_table(
+        table: Union[pd.DataFrame, Any],
+        *,
+        image_ids: pd.Index,
+        image_id_column: str = IMAGE_ID_COLUMN,
+        name: str = "table",
+) -> Dict[Hashable, pd.DataFrame]:
+    """
+    Split a long-format detection table with one row per bounding box into the dictionary layout with one
+    pd.DataFrame per image. The rows are grouped by a single stable sort of the integer-coded image identifiers,
+    and each image frame is cut out of the sorted table by its offsets. Thus, the table is traversed only once,
+    independent of the number of images. Images without any rows obtain an empty pd.DataFrame with the same columns.
+
+    Args:
+        table: pd.DataFrame or pyarrow.Table with one row per bounding box and a column with the image identifier.
+        image_ids: Unique identifiers of all images (typically the index of the "__meta__" DataFrame).
+        image_id_column: Name of the column holding the image identifier. Default is "image_id".
+        name: Name of the table used within error messages.
+
+    Returns:
+        Dictionary with an individual pd.DataFrame for each image identifier given by 'image_ids'.
+
+    Raises:
+        TypeError: if 'table' is neither pd.DataFrame nor pyarrow.Table.
+        AttributeError: if the column 'image_id_column' does not exist within 'table'.
+        ValueError: if 'image_ids' contains duplicates.
+        ValueError: if 'table' contains image identifiers that are not part of 'image_ids'.
+    """
+
+    frame = _to_pandas(table, name)
+    if image_id_column not in frame.columns:
+        raise AttributeError(f"Column '{image_id_column}' with the image identifiers not found in '{name}'.")
+
+    image_ids = pd.Index(image_ids)
+    if not image_ids.is_unique:
+        raise ValueError(f"Image identifiers for '{name}' must be unique.")
+
+    codes = image_ids.get_indexer(frame[image_id_column])
+    if np.any(codes < 0):
+        unknown = frame[image_id_column][codes < 0].unique()[:5].tolist()
+        raise ValueError(f"Found image identifiers in '{name}' without meta information: {unknown}")
+
+    data = frame.drop(columns=image_id_column)
+
+    # a stable sort keeps the original box order within each image; tables that are already
+    # sorted by image (the common case for dumps) can directly be sliced without reordering
+    if np.all(codes[:-1] <= codes[1:]):
+        order = None
+        sorted_codes = codes
+    else:
+        order = np.argsort(codes, kind="stable")
+        data = data.take(order)
+        sorted_codes = codes[order]
+
+    offsets = np.searchsorted(sorted_codes, np.arange(len(image_ids) + 1), side="left")
+
+    result = {}
+    for i, image_id in enumerate(image_ids):
+        result[image_id] = data.iloc[offsets[i]:offsets[i + 1]].reset_index(drop=True)
+
+    return result
+
+
+def meta_frame(meta: Union[pd.DataFrame, Any], image_id_column: str = IMAGE_ID_COLUMN) -> pd.DataFrame:
+    """
+    Return the image meta information as pd.DataFrame indexed by the image identifier. If the image identifier
+    column exists, it is used as index, otherwise the index of the given frame is kept.
+    """
+
+    meta = _to_pandas(meta, "meta")
+    if image_id_column in meta.columns:
+        meta = meta.set_index(image_id_column)
+
+    return meta
+
+
+def detection_inputs_from_tables(
+        *,
+        predictions: Union[pd.DataFrame, Any],
+        annotations: Union[pd.DataFrame, Any],
+        meta: Union[pd.DataFrame, Any],
+        image_id_column: str = IMAGE_ID_COLUMN,
+) -> Tuple[Dict[Hashable, pd.DataFrame], Dict[Hashable, pd.DataFrame]]:
+    """
+    Convert long-format detection predictions and annotations into the dictionary layout expected by Thetis.
+    Both tables hold one row per bounding box with an additional column for the image identifier.
+
+    Args:
+        predictions: pd.DataFrame or pyarrow.Table with predicted objects, containing columns "labels", "confidence",
+            the bounding box coordinates and the image identifier column.
+        annotations: pd.DataFrame or pyarrow.Table with ground truth objects, containing columns "target",
+            the bounding box coordinates, optionally sensitive attributes and the image identifier column.
+        meta: pd.DataFrame or pyarrow.Table with columns "width" and "height" for each image. The image identifiers
+            are either given by the frame index or by the image identifier column.
+        image_id_column: Name of the column holding the image identifier. Default is "image_id".
+
+    Returns:
+        Tuple with dictionaries for predictions and annotations. The annotations dictionary also holds the
+        "__meta__" field.
+
+    Raises:
+        TypeError: if any of 'predictions', 'annotations' or 'meta' is neither pd.DataFrame nor pyarrow.Table.
+        AttributeError: if the column 'image_id_column' does not exist within 'predictions' or 'annotations'.
+        ValueError: if the image identifiers in 'meta' contain duplicates.
+        ValueError: if 'predictions' or 'annotations' contain image identifiers that are not part of 'meta'.
+    """
+
+    meta = meta_frame(meta, image_id_column)
+
+    predictions = split_detection_table(
+        predictions, image_ids=meta.index, image_id_column=image_id_column, name="predictions",
+    )
+    annotations = split_detection_table(
+        annotations, image_ids=meta.index, image_id_column=image_id_column, name="annotations",
+    )
+    annotations[META_KEY] = meta
+
+    return predictions, annotations
+
+
+def predictions_from_array(
+        confidence: np.ndarray,
+        *,
+        distinct_classes: Sequence[Union[int, str]],
+        labels: Optional[Union[np.ndarray, Sequence[Union[int, str]]]] = None,
+        index: Optional[pd.Index] = None,
+        binary_positive_label: Optional[Union[int, str]] = None,
+) -> pd.DataFrame:
+    """
+    Build the classification predictions DataFrame from a 2-D confidence array of shape (N, K) with one column per
+    class in the order of 'distinct_classes' (e.g., the Softmax output of a neural network). The confidence columns
+    "confidence_<label>" of the resulting DataFrame reference the given array (also a np.memmap) without copying it,
+    and the dtype (e.g., float32) is preserved. Only the "labels" column is newly allocated.
+
+    Args:
+        confidence: Array of shape (N, K) with the confidence for each sample and class.
+        distinct_classes: Labels of the K classes in the order of the array columns. Must match the
+            "distinct_classes" of the application config.
+        labels: Optional predicted label for each sample. Default is None (label with the highest confidence).
+        index: Optional index of the DataFrame that must match the index of the annotations. Default is None
+            (range index).
+        binary_positive_label: Binary classification only (K = 2): if given, a single "confidence" column with the
+            confidence of this label is created as expected for binary classification. Default is None.
+
+    Returns:
+        pd.DataFrame with column "labels" and confidence columns in the format expected by :func:`thetis.thetis`.
+
+    Raises:
+        ValueError: if 'confidence' is not a 2-D array with one column per class in 'distinct_classes'.
+        ValueError: if 'binary_positive_label' is given but there are not exactly 2 classes or the label cannot be
+            found in 'distinct_classes'.
+    """
+
+    confidence = np.asarray(confidence)
+    distinct_classes = list(distinct_classes)
+
+    if confidence.ndim != 2 or confidence.shape[1] != len(distinct_classes):
+        raise ValueError(
+            f"'confidence' must be of shape (N, {len(distinct_classes)}) according to 'distinct_classes', "
+            f"got {confidence.shape}."
+        )
+
+    if labels is None:
+        labels = np.asarray(distinct_classes, dtype=object)[np.argmax(confidence, axis=1)]
+
+    if binary_positive_label is not None:
+        if len(distinct_classes) != 2 or binary_positive_label not in distinct_classes:
+            raise ValueError("'binary_positive_label' requires exactly 2 classes containing this label.")
+
+        column = distinct_classes.index(binary_positive_label)
+        frame = pd.DataFrame({"confidence": confidence[:, column]}, index=index, copy=False)
+
+    else:
+        # 'copy=False' lets the DataFrame reference the array as a single block instead of copying it
+        frame = pd.DataFrame(
+            confidence,
+            columns=[f"confidence_{label}" for label in distinct_classes],
+            index=index,
+            copy=False,
+        )
+
+    frame.insert(0, "labels", labels)
+
+    return frame
+
+
+def _integral_values(values: pd.Series) -> pd.Series:
+    """
+    Integer-coded attributes with missing values are float columns. Such columns are converted to the nullable
+    integer type so that group labels read "1&x" rather than "1.0&x", matching the attribute values in thetiscore.
+    """
+
+    if not pd.api.types.is_float_dtype(values):
+        return values
+
+    present = values.dropna().to_numpy()
+    if not np.all(np.isfinite(present)) or not np.array_equal(present, np.round(present)):
+        return values
+
+    return values.astype("Int64")
+
+
+def _intersect_columns(frame: pd.DataFrame, columns: Sequence[str], separator: str) -> np.ndarray:
+    """
+    Combine the given attribute columns into a single intersectional attribute in one pass: the factorized codes
+    of all columns are merged into one mixed-radix integer key, and labels are only built for the observed groups.
+    Rows with a missing value in any of the columns are missing (NaN) in the result as well.
+    """
+
+    codes, uniques, radix = [], [], 1
+    for column in columns:
+        column_codes, values = pd.factorize(_integral_values(frame[column]))
+        radix *= max(len(values), 1)
+        if radix >= np.iinfo(np.int64).max:
+            raise ValueError(f"Too many combinations of the attributes {list(columns)} for an intersectional group.")
+
+        codes.append(column_codes)
+        uniques.append(np.asarray(values, dtype=object))
+
+    missing = np.any([column_codes < 0 for column_codes in codes], axis=0)
+    if missing.all():
+        return np.full(len(frame), np.nan, dtype=object)
+
+    key = np.zeros(len(frame), dtype=np.int64)
+    for column_codes, values in zip(codes, uniques):
+        key = key * len(values) + column_codes
+
+    key[missing] = -1
+    group_codes, group_keys = pd.factorize(key)
+
+    # decode the mixed-radix key of each observed group into its attribute values
+    digits, parts = np.maximum(group_keys, 0), []
+    for values in reversed(uniques):
+        parts.insert(0, values[digits % len(values)])
+        digits = digits // len(values)
+
+    labels = np.array([separator.join(str(value) for value in group) for group in zip(*parts)], dtype=object)
+    labels[group_keys < 0] = np.nan
+
+    return labels.take(group_codes)
+
+
+def _valid_classes(config: Dict, columns: Sequence[str]) -> Union[str, list]:
+    """ Classes for which an intersectional attribute is valid: the classes for which all its attributes are valid. """
+
+    sensitive_attributes = (config.get("fairness") or {}).get("sensitive_attributes") or {}
+    distinct_classes = list((config.get("task_settings") or {}).get("distinct_classes") or [])
+
+    valid = None
+    for column in columns:
+        classes = sensitive_attributes.get(column)
+        if classes is None or classes == "" or classes == "all":
+            continue
+
+        classes = [classes] if isinstance(classes, (str, int)) else list(classes)
+        valid = classes if valid is None else [label for label in valid if label in classes]
+
+    if valid is None:
+        return "all"
+
+    # keep the order of 'task_settings/distinct_classes' if given
+    return [label for label in distinct_classes if label in valid] if distinct_classes else valid
+
+
+def add_intersectional_attributes(
+        *,
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame], Any],
+        config: Union[str, os.PathLike, Dict],
+        intersections: Sequence[Sequence[str]],
+        separator: str = "&",
+) -> Tuple[Union[pd.DataFrame, Dict[str, pd.DataFrame]], Dict]:
+    """
+    Add intersectional sensitive attributes (e.g., gender & age & region) for the fairness evaluation. For each
+    combination of attributes, a new annotation column named after the joined attribute names (e.g.,
+    "gender&age") is added, holding the joined attribute values of each sample (e.g., "female&adult"). The new
+    attributes are registered under "fairness/sensitive_attributes" of the returned config and are valid for the
+    classes for which all combined attributes are valid.
+
+    All groups are computed in a single pass over the data by combining the integer codes of the attributes into
+    one mixed-radix key, rather than filtering the data once per group. For detection, the annotations of all
+    images are processed at once.
+
+    Args:
+        annotations: Ground truth data, see :func:`thetis.thetis`. For detection, either the dictionary layout or
+            a long-format table (pd.DataFrame or pyarrow.Table) can be passed.
+        config: Application configuration options (dict or path to a YAML file). It is not modified.
+        intersections: Combinations of sensitive attribute columns, e.g., [("gender", "age"), ("gender", "region")].
+        separator: Separator used to join the attribute names and values. Default is "&".
+
+    Returns:
+        Tuple with the annotations including the intersectional attribute columns (the input is not modified) and
+        the config dictionary including the intersectional sensitive attributes.
+
+    Raises:
+        ValueError: if an intersection contains less than 2 attributes.
+        ValueError: if the number of attribute combinations exceeds the range of a 64-bit integer.
+        AttributeError: if a requested attribute column does not exist within the (non-empty) annotations.
+        TypeError: if 'annotations' is neither a pd.DataFrame, a pyarrow.Table nor a dict of pd.DataFrame.
+    """
+
+    if not isinstance(config, dict):
+        import yaml
+        with open(config, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+
+    config = copy.deepcopy(config)
+    intersections = [list(columns) for columns in intersections]
+    for columns in intersections:
+        if len(columns) < 2:
+            raise ValueError(f"An intersection must combine at least 2 attributes, got {columns}.")
+
+    is_dict = isinstance(annotations, dict)
+    if is_dict:
+        keys = [key for key in annotations.keys() if key != META_KEY]
+        frames = [annotations[key] for key in keys]
+    else:
+        frames = [_to_pandas(annotations, "annotations")]
+
+    # images without annotations may come as empty frames without any columns and are skipped
+    required = sorted({column for columns in intersections for column in columns})
+    filled = [i for i, frame in enumerate(frames) if len(frame) > 0]
+    for i in filled:
+        missing = [column for column in required if column not in frames[i].columns]
+        if missing:
+            raise AttributeError(f"Sensitive attribute column(s) {missing} not found within 'annotations'.")
+
+    # the attribute columns of all images are concatenated once so that group labels are computed in one pass
+    table = None
+    if filled:
+        table = pd.concat([frames[i][required] for i in filled], ignore_index=True) if len(filled) > 1 \
+            else frames[filled[0]][required]
+
+    offsets = np.cumsum([len(frames[i]) for i in filled])[:-1]
+    empty = np.empty(0, dtype=object)
+
+    new_columns = {}
+    # an empty "fairness" section in YAML is read as None
+    config["fairness"] = config.get("fairness") or {}
+    sensitive_attributes = config["fairness"].get("sensitive_attributes") or {}
+    for columns in intersections:
+        name = separator.join(columns)
+        parts = np.split(_intersect_columns(table, columns, separator), offsets) if table is not None else []
+        new_columns[name] = dict(zip(filled, parts))
+        sensitive_attributes[name] = _valid_classes(config, columns)
+
+    config["fairness"]["sensitive_attributes"] = sensitive_attributes
+    frames = [
+        frame.assign(**{name: parts.get(i, empty) for name, parts in new_columns.items()})
+        for i, frame in enumerate(frames)
+    ]
+
+    if not is_dict:
+        return frames[0], config
+
+    result = dict(zip(keys, frames))
+    if META_KEY in annotations:
+        result[META_KEY] = annotations[META_KEY]
+
+    return result, config
+
+
+def prepare_inputs(
+        predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations_meta: Optional[pd.DataFrame] = None,
+) -> Tuple[Union[pd.DataFrame, Dict], Union[pd.DataFrame, Dict]]:
+    """
+    Bring predictions and annotations into the input format expected by thetiscore. Long-format detection tables
+    are converted when 'annotations_meta' is given, all other inputs are passed through unchanged.
+    """
+
+    if annotations_meta is None:
+        return predictions, annotations
+
+    return detection_inputs_from_tables(predictions=predictions, annotations=annotations, meta=annotations_meta)
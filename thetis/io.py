@@ -5,39 +5,375 @@ This module provides functions to read and write JSON files that may contain ref
 to external pandas DataFrames.
 """
 
-from typing import Dict
+import os
+import json
+import shutil
+import functools
+from collections.abc import Mapping
+from typing import Union, Dict, List, Iterator, Callable, Any
+import numpy as np
+import pandas as pd
 
 from thetiscore import read_json_with_pandas as read_core
 from thetiscore import write_json_with_pandas as write_core
 
 
-def read_json_with_pandas(json_filename: str) -> Dict:
+# marker of the JSON skeleton format with DataFrames stored in binary sidecar files
+SIDECAR_MARKER = "__thetis_sidecar__"
+SIDECAR_VERSION = 1
+FRAME_KEY = "__thetis_frame__"
+FRAME_FORMATS = ("arrow", "parquet")
+FRAME_EXTENSIONS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+# dictionaries with non-string keys (e.g., integer image identifiers) are stored as list of [key, value] pairs
+ITEMS_KEY = "__thetis_items__"
+TUPLE_KEY = "__thetis_tuple__"
+
+
+def _import_pyarrow(purpose: str = "Reading or writing DataFrames in 'arrow' or 'parquet' format") -> Any:
+    """ Import pyarrow, which is only required for the binary sidecar format and the evaluation server. """
+
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            f"{purpose} requires the optional dependency 'pyarrow' (pip install thetis[arrow])."
+        ) from e
+
+    return pyarrow
+
+
+def _sidecar_directory(filename: str) -> str:
+    """ Directory holding the sidecar files of a JSON skeleton file. """
+
+    return f"{filename}.frames"
+
+
+def _is_sidecar_file(json_filename: str) -> bool:
+    """ Check whether a JSON file has been written in the sidecar format by inspecting its first bytes only. """
+
+    with open(json_filename, "rb") as f:
+        head = f.read(64)
+
+    return f'{{"{SIDECAR_MARKER}"'.encode() in head.replace(b" ", b"")
+
+
+def _write_frame(pa: Any, frame: pd.DataFrame, path: str, frame_format: str) -> Dict:
+    """ Write a single DataFrame to a sidecar file and return the JSON reference to it. """
+
+    reference = {FRAME_KEY: os.path.basename(path), "format": frame_format}
+
+    # Arrow only supports string field names; other column labels are restored from the reference
+    if not all(isinstance(column, str) for column in frame.columns):
+        reference["columns"] = frame.columns.tolist()
+        frame = frame.set_axis([str(i) for i in range(frame.shape[1])], axis=1)
+
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    if frame_format == "arrow":
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        pa.parquet.write_table(table, path)
+
+    return reference
+
+
+def _read_frame(reference: Dict, directory: str, memory_map: bool = False) -> pd.DataFrame:
+    """ Load a single DataFrame from the sidecar file given by a JSON reference. """
+
+    pa = _import_pyarrow()
+    path = os.path.join(directory, reference[FRAME_KEY])
+
+    if reference["format"] == "arrow":
+        source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        table = pa.ipc.open_file(source).read_all()
+    else:
+        table = pa.parquet.read_table(path, memory_map=memory_map)
+
+    # 'split_blocks' avoids consolidating the columns into a single block, which allows
+    # pandas to keep referencing the (memory-mapped) Arrow buffers instead of copying them
+    frame = table.to_pandas(split_blocks=True)
+    if "columns" in reference:
+        frame.columns = reference["columns"]
+
+    return frame
+
+
+def _encode_key(key: Any) -> Any:
+    """ JSON representation of a dictionary key that is not a string; tuples are tagged to be restored as such. """
+
+    if isinstance(key, np.generic):
+        key = key.item()
+
+    if isinstance(key, tuple):
+        return {TUPLE_KEY: [_encode_key(item) for item in key]}
+
+    if key is None or isinstance(key, (str, bool, int, float)):
+        return key
+
+    raise TypeError(
+        f"Dictionary keys of type {type(key).__name__} cannot be stored in the sidecar format "
+        f"(supported are str, int, float, bool, None and tuples thereof), got key {key!r}."
+    )
+
+
+def _decode_key(key: Any) -> Any:
+    """ Restore a dictionary key encoded by '_encode_key'. """
+
+    if isinstance(key, dict):
+        return tuple(_decode_key(item) for item in key[TUPLE_KEY])
+
+    return key
+
+
+def _decode_items(obj: Dict) -> Dict:
+    """ Restore a dictionary with non-string keys from its list of [key, value] pairs (values are kept raw). """
+
+    return {_decode_key(key): value for key, value in obj[ITEMS_KEY]}
+
+
+def _encode(obj: Any, pa: Any, directory: str, frame_format: str, counter: List[int]) -> Any:
+    """ Recursively replace DataFrames by references to sidecar files. """
+
+    if isinstance(obj, pd.DataFrame):
+        path = os.path.join(directory, f"frame_{counter[0]:06d}{FRAME_EXTENSIONS[frame_format]}")
+        counter[0] += 1
+        return _write_frame(pa, obj, path, frame_format)
+
+    if isinstance(obj, dict):
+        if all(isinstance(key, str) for key in obj.keys()):
+            return {key: _encode(value, pa, directory, frame_format, counter) for key, value in obj.items()}
+
+        # JSON objects only support string keys, so keys of other types are stored along with the values
+        return {ITEMS_KEY: [
+            [_encode_key(key), _encode(value, pa, directory, frame_format, counter)] for key, value in obj.items()
+        ]}
+
+    if isinstance(obj, (list, tuple)):
+        return [_encode(value, pa, directory, frame_format, counter) for value in obj]
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+
+    if isinstance(obj, np.generic):
+        return obj.item()
+
+    return obj
+
+
+def _decode(obj: Any, directory: str, memory_map: bool = False) -> Any:
+    """ Recursively replace references to sidecar files by the respective DataFrames. """
+
+    if isinstance(obj, dict):
+        if FRAME_KEY in obj:
+            return _read_frame(obj, directory, memory_map=memory_map)
+
+        if ITEMS_KEY in obj:
+            obj = _decode_items(obj)
+
+        return {key: _decode(value, directory, memory_map) for key, value in obj.items()}
+
+    if isinstance(obj, list):
+        return [_decode(value, directory, memory_map) for value in obj]
+
+    return obj
+
+
+def read_json_with_pandas(json_filename: str, memory_map: bool = False) -> Dict:
     """
     Read a JSON dictionary from disk that might also contain references to external pd.DataFrames with
-    additional data.
+    additional data. Both the plain JSON format and the JSON skeleton format with binary sidecar files
+    (see :func:`write_json_with_pandas`) are supported; the format is detected automatically.
 
     Args:
         json_filename: The filename of the root JSON file.
+        memory_map: If True, sidecar files are memory-mapped instead of read into memory. For the "arrow" format,
+            the DataFrames then reference the mapped file buffers without copying. Ignored for plain JSON files.
+            Default is False.
 
     Returns:
         A dictionary containing the content of the JSON file.
+
+    Raises:
+        ImportError: if the file uses the sidecar format but 'pyarrow' is not installed.
+    """
+
+    if not _is_sidecar_file(json_filename):
+        return read_core(json_filename=json_filename)
+
+    with open(json_filename, "r", encoding="utf-8") as f:
+        skeleton = json.load(f)
+
+    directory = os.path.join(os.path.dirname(json_filename), skeleton["directory"])
+    return _decode(skeleton["content"], directory, memory_map=memory_map)
+
+
+class LazyJsonDict(Mapping):
+    """
+    Read-only mapping over the content of a JSON file written by :func:`write_json_with_pandas`. Nested dictionaries
+    are wrapped as :class:`LazyJsonDict` as well, and pd.DataFrame entries stored in sidecar files are only loaded
+    when they are accessed. Use :func:`read_json_lazy` to create an instance.
+
+    Note: loaded DataFrames are shared with the internal LRU cache of decoded frames and should not be modified
+    in place.
     """
 
-    return read_core(json_filename=json_filename)
+    def __init__(self, content: Union[Dict, Callable[[], Dict]], load_frame: Callable[[Dict], pd.DataFrame]):
+
+        self._content = content
+        self._load_frame = load_frame
+
+    @property
+    def _data(self) -> Dict:
+        """ Content dictionary, loaded on first access if a loader function has been given. """
+
+        if callable(self._content):
+            self._content = self._content()
+
+        return self._content
+
+    def _wrap(self, value: Any) -> Any:
+        """ Return a raw JSON value with frame references resolved and nested dictionaries wrapped. """
+
+        if isinstance(value, dict):
+            if FRAME_KEY in value:
+                return self._load_frame(value)
+
+            if ITEMS_KEY in value:
+                value = _decode_items(value)
+
+            return LazyJsonDict(value, self._load_frame)
+
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+
+        return value
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._wrap(self._data[key])
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"LazyJsonDict({len(self._data)} keys)"
+
+    def to_dict(self) -> Dict:
+        """ Materialize the full content including all pd.DataFrame entries as a plain dictionary. """
+
+        def materialize(value: Any) -> Any:
+            if isinstance(value, LazyJsonDict):
+                return {key: materialize(value[key]) for key in value}
+            if isinstance(value, list):
+                return [materialize(item) for item in value]
+            return value
+
+        return materialize(self)
+
+
+def read_json_lazy(json_filename: str, memory_map: bool = False, cache_size: int = 32) -> LazyJsonDict:
+    """
+    Open a JSON dictionary from disk for lazy, partial access. Only the JSON skeleton is parsed up front;
+    pd.DataFrame entries stored in sidecar files (see :func:`write_json_with_pandas` with 'frame_format' "arrow"
+    or "parquet") are loaded on access, and the most recently decoded frames are kept in an LRU cache. Thus,
+    looking up a single image or a single result section only reads the respective sidecar files.
+
+    Files in the plain JSON format embed all DataFrames within the JSON document itself. These are still
+    supported but are read completely on first access.
+
+    Args:
+        json_filename: The filename of the root JSON file.
+        memory_map: If True, sidecar files are memory-mapped instead of read into memory. Default is False.
+        cache_size: Maximum number of decoded pd.DataFrame instances held in the LRU cache. Default is 32.
+
+    Returns:
+        Read-only mapping with the content of the JSON file.
+
+    Raises:
+        ImportError: if the file uses the sidecar format but 'pyarrow' is not installed (raised on first access
+            of a DataFrame entry).
+    """
+
+    if not _is_sidecar_file(json_filename):
+        return LazyJsonDict(lambda: read_core(json_filename=json_filename), load_frame=lambda reference: reference)
+
+    with open(json_filename, "r", encoding="utf-8") as f:
+        skeleton = json.load(f)
+
+    directory = os.path.join(os.path.dirname(json_filename), skeleton["directory"])
+    references = {}
+
+    # sidecar file names are unique within a dump and serve as cache key
+    @functools.lru_cache(maxsize=cache_size)
+    def load_cached(name: str) -> pd.DataFrame:
+        return _read_frame(references[name], directory, memory_map=memory_map)
+
+    def load_frame(reference: Dict) -> pd.DataFrame:
+        references.setdefault(reference[FRAME_KEY], reference)
+        return load_cached(reference[FRAME_KEY])
+
+    # the top-level dictionary may hold non-string keys as well (e.g., integer image identifiers)
+    content = skeleton["content"]
+    if ITEMS_KEY in content:
+        content = _decode_items(content)
+
+    return LazyJsonDict(content, load_frame=load_frame)
 
 
 def write_json_with_pandas(
         json_like: Dict,
         filename: str,
+        frame_format: str = "json",
 ) -> None:
     """
     Write a dictionary with pd.DataFrames as single entries to a JSON file.
-    All data will be written to a single JSON file with JSON string representations of the provided pd.DataFrame
-    instances.
+    By default, all data will be written to a single JSON file with JSON string representations of the provided
+    pd.DataFrame instances.
+
+    For large DataFrames, the binary formats "arrow" (Arrow IPC, memory-mappable) and "parquet" (compressed) can be
+    selected. In this case, only the JSON skeleton is written to 'filename' and each pd.DataFrame is stored in an
+    individual sidecar file within the directory "<filename>.frames" next to it. Dictionary keys of type int, float,
+    bool, None or tuple (e.g., integer image identifiers) are restored with their original type on reading.
 
     Args:
         json_like: The input dictionary with pd.DataFrame entries.
         filename: The filename to write the JSON data to.
+        frame_format: Storage format of the pd.DataFrame entries. Must be one of "json", "arrow", "parquet".
+            Default is "json".
+
+    Raises:
+        ValueError: if 'frame_format' is not one of "json", "arrow", "parquet".
+        TypeError: if 'frame_format' is "arrow" or "parquet" and a dictionary key is of any other type than str,
+            int, float, bool, None or a tuple thereof.
+        ImportError: if 'frame_format' is "arrow" or "parquet" but 'pyarrow' is not installed.
     """
 
-    write_core(json_like=json_like, filename=filename)
+    if frame_format == "json":
+        write_core(json_like=json_like, filename=filename)
+        return
+
+    if frame_format not in FRAME_FORMATS:
+        raise ValueError(f"Unknown frame format '{frame_format}'. Must be one of 'json', 'arrow', 'parquet'.")
+
+    pa = _import_pyarrow()
+
+    # stale sidecar files of a previous dump must not survive
+    directory = _sidecar_directory(filename)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+    content = _encode(json_like, pa, directory, frame_format, counter=[0])
+    skeleton = {
+        SIDECAR_MARKER: SIDECAR_VERSION,
+        "directory": os.path.basename(directory),
+        "content": content,
+    }
+
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(skeleton, f)
@@ -5,23 +5,33 @@ This module provides an MLflow-compatible wrapper function for the Thetis evalua
 """
 
 import os
-from typing import Union, Optional, Tuple, Dict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Union, Optional, Tuple, Dict, Any
 import pandas as pd
 
 from thetiscore import thetis_mlflow as thetiscore_mlflow
 
+from .data import prepare_inputs
+from .profiling import Profiler
+from .profiling import SpanHook
+from .profiling import TIMINGS_KEY
+
 
 def thetis_mlflow(
         *,
         config: Union[str, os.PathLike, Dict],
         predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
         annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations_meta: Optional[pd.DataFrame] = None,
         description: Dict[str, str] = None,
         mlflow_step: Optional[int] = None,
         predictions_perturbations: None = None,
         license_file_path: Union[str, os.PathLike] = None,
         license_xml_str: str = None,
         license_key_and_signature: Tuple[str, str] = None,
+        profile: bool = False,
+        span_hook: Optional[SpanHook] = None,
 ) -> Dict:
     """
     Main function for the Thetis evaluation toolkit with added MLflow logging support. Given a ground truth dataset and
@@ -148,6 +158,10 @@ def thetis_mlflow(
             coordinates and optionally sensitive attributes. The bounding box columns must correspond to the format
             specified in the user configuration. Must also include a "__meta__" key with image metadata.
             **Regression:** DataFrame with columns "target" and optionally sensitive attributes.
+        annotations_meta: Detection only: DataFrame with image meta information (columns "width" and "height"),
+            indexed by the image identifier. If given, 'predictions' and 'annotations' are expected in long format
+            as a single DataFrame (or pyarrow.Table) each with one row per bounding box and an additional column
+            "image_id". Default is None (dictionary layout).
          description: dict containing a description of your AI solution required for creating a technical documentation
             in accordance with Article 11 and Annex IV of the AI Act. The data entered here includes the title,
             provider, contact person (intern), contact person (extern), purpose, requirements, forms of distribution,
@@ -160,6 +174,11 @@ def thetis_mlflow(
         license_file_path: Path to an XML license file to run the application.
         license_xml_str: String representation of an XML license file to run the application.
         license_key_and_signature: Tuple of license key and signature strings.
+        profile: If True, the wall time, CPU time and peak memory of the stages of this call are recorded,
+            returned within the section "__timings__" of the result dictionary and logged to MLflow as metrics
+            :code:`timings/<stage>/<measure>` (see 'profile' of :func:`thetis.thetis`). Default is False.
+        span_hook: Optional function called with the name and the record of each stage when it has finished,
+            see :func:`thetis.thetis`. Default is None.
 
     Returns:
         Dictionary with the evaluation results, rating scores, and recommendations for the examined AI model.
@@ -205,6 +224,8 @@ def thetis_mlflow(
         AttributeError: if the requested column for a sensitive feature does not exist within the ground truth dataset.
         AttributeError: if the field '__meta__' within the ground truth dataset annotations is completely missing.
         AttributeError: if the meta information provided by '__meta__' is missing for a certain image.
+        AttributeError: if 'annotations_meta' is given but column "image_id" is missing in 'predictions' or
+            'annotations' (detection).
         ValueError: if "distinct_classes" in application config contains duplicates (classification or detection).
         ValueError: if the data type conversion to one of "int" or "str" of column "labels" failed
             (classification or detection).
@@ -225,6 +246,9 @@ def thetis_mlflow(
         ValueError: if a sensitive feature has a missing or invalid entry.
         ValueError: if a sensitive feature has less than 2 distinct labels.
         ValueError: if the image width or height information provided by '__meta__' for a certain image are <= 0.
+        ValueError: if 'annotations_meta' is given but its image identifiers contain duplicates (detection).
+        ValueError: if 'annotations_meta' is given but 'predictions' or 'annotations' contain image identifiers
+            without meta information (detection).
         ValueError: if bbox_format is 'xyxy' and xmin > xmax (detection).
         ValueError: if bbox_format is 'xyxy' and ymin > ymax (detection).
         ValueError: if bbox_format is 'xywh' or 'cxcywh' and width is negative (detection).
@@ -232,6 +256,8 @@ def thetis_mlflow(
         NotImplementedError: if task is not one of "classification", "regression", or "detection".
         NotImplementedError: if the bounding box matching strategy is not one of "exclusive", "max".
         TypeError: if config is neither str nor python dict.
+        TypeError: if 'annotations_meta' is given but 'predictions', 'annotations' or 'annotations_meta' is
+            neither pd.DataFrame nor pyarrow.Table (detection).
         TypeError: if 'predictions' is not type pd.DataFrame (classification or regression).
         TypeError: if 'annotations' is not type pd.DataFrame (classification or regression).
         TypeError: if 'predictions' is not type dict (detection).
@@ -252,14 +278,187 @@ def thetis_mlflow(
         thetiscore.errors.ThetisInternalError: if an unexpected application error occurred.
     """
 
-    return thetiscore_mlflow(
+    profiler = Profiler(enabled=profile, span_hook=span_hook)
+
+    with profiler.stage("thetis_mlflow"):
+        with profiler.stage("prepare_inputs"):
+            predictions, annotations = prepare_inputs(predictions, annotations, annotations_meta)
+
+        with profiler.stage("evaluation"):
+            result = thetiscore_mlflow(
+                config=config,
+                predictions=predictions,
+                annotations=annotations,
+                description=description,
+                mlflow_step=mlflow_step,
+                predictions_perturbations=predictions_perturbations,
+                license_file_path=license_file_path,
+                license_xml_str=license_xml_str,
+                license_key_and_signature=license_key_and_signature,
+            )
+
+    if profile:
+        import mlflow
+
+        result[TIMINGS_KEY] = profiler.timings()
+        mlflow.log_metrics(profiler.metrics(), step=mlflow_step)
+
+    return result
+
+
+# maximum number of asynchronous evaluations that may be queued or running at the same time
+MAX_PENDING_EVALUATIONS = 4
+
+# first MLflow version that tracks the active run per thread, required to log from the background thread
+MIN_MLFLOW_VERSION = "2.18"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = threading.BoundedSemaphore(MAX_PENDING_EVALUATIONS)
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """ Background executor for asynchronous evaluations. A single worker preserves the order of MLflow steps. """
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thetis-mlflow")
+
+    return _executor
+
+
+def _thread_run_stack() -> Optional[list]:
+    """ Run stack of the current thread, or None if MLflow shares a single run stack between all threads. """
+
+    from mlflow.tracking import fluent
+
+    stack = getattr(fluent, "_active_run_stack", None)
+    get = getattr(stack, "get", None)
+
+    return get() if callable(get) else None
+
+
+def _release_run() -> None:
+    """ Remove the active run from the run stack of the current thread without terminating the run. """
+
+    # 'mlflow.end_run' would set the status and end time of the run, which is still used by the caller
+    stack = _thread_run_stack()
+    if stack:
+        stack.pop()
+
+
+def _run_in_background(run_id: str, kwargs: Dict[str, Any]) -> Dict:
+    """ Run thetis_mlflow within the MLflow run that has been active in the calling thread. """
+
+    import mlflow
+    from mlflow.entities import RunStatus
+
+    # the caller may have finished the run in the meantime; resuming sets its status back to RUNNING
+    client = mlflow.MlflowClient()
+    info = client.get_run(run_id).info
+
+    # MLflow tracks the active run per thread, so the caller's run is resumed within the worker thread
+    # and released afterwards without finishing it, as the caller may still be logging to this run
+    mlflow.start_run(run_id=run_id, log_system_metrics=False)
+    try:
+        return thetis_mlflow(**kwargs)
+    finally:
+        _release_run()
+        if RunStatus.is_terminated(RunStatus.from_string(info.status)):
+            client.set_terminated(run_id, status=info.status, end_time=info.end_time)
+
+
+def thetis_mlflow_async(
+        *,
+        config: Union[str, os.PathLike, Dict],
+        predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations_meta: Optional[pd.DataFrame] = None,
+        description: Dict[str, str] = None,
+        mlflow_step: Optional[int] = None,
+        predictions_perturbations: None = None,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        license_key_and_signature: Tuple[str, str] = None,
+        profile: bool = False,
+        span_hook: Optional[SpanHook] = None,
+) -> Future:
+    """
+    Non-blocking variant of :func:`thetis.thetis_mlflow`. The evaluation as well as the logging of all metrics and
+    artifacts is performed on a background thread, and this function returns immediately with a
+    :class:`concurrent.futures.Future` that resolves to the result dictionary. Results are logged to the MLflow run
+    that is active in the calling thread. Evaluations are processed one after another in the order of submission.
+
+    Note: this function must be called within an active MLflow run and requires MLflow >= 2.18. The run may be
+    finished before all evaluations are done; its status and end time are kept.
+
+    At most :code:`MAX_PENDING_EVALUATIONS` evaluations may be pending at the same time. If this limit is reached,
+    this function blocks until a previous evaluation has finished, which bounds the memory held by queued inputs.
+    Pending evaluations are completed before the Python interpreter exits.
+
+    Note: the given inputs are referenced until the evaluation has finished and must not be modified in place
+    in the meantime.
+
+    Args:
+        config: Application configuration options provided by the user.
+        predictions: Predictions made by the AI model, see :func:`thetis.thetis_mlflow`.
+        annotations: Ground truth data, see :func:`thetis.thetis_mlflow`.
+        annotations_meta: Detection only: image meta information for long-format inputs,
+            see :func:`thetis.thetis_mlflow`.
+        description: dict containing a description of your AI solution, see :func:`thetis.thetis_mlflow`.
+        mlflow_step: Optional integer with the current step count to be passed to MLflow.
+        predictions_perturbations: AI predictions for each configured perturbation type.
+        license_file_path: Path to an XML license file to run the application.
+        license_xml_str: String representation of an XML license file to run the application.
+        license_key_and_signature: Tuple of license key and signature strings.
+        profile: Enables profiling of the evaluation stages, see :func:`thetis.thetis_mlflow`. Default is False.
+        span_hook: Optional function called for each finished stage, see :func:`thetis.thetis_mlflow`.
+
+    Returns:
+        Future resolving to the dictionary with the evaluation results, rating scores, and recommendations.
+        Any error raised by :func:`thetis.thetis_mlflow` is re-raised by :meth:`concurrent.futures.Future.result`.
+
+    Raises:
+        RuntimeError: if the installed MLflow version does not track the active run per thread.
+        RuntimeError: if no MLflow run is active.
+    """
+
+    import mlflow
+
+    if _thread_run_stack() is None:
+        raise RuntimeError(
+            f"'thetis_mlflow_async' requires MLflow >= {MIN_MLFLOW_VERSION}, found MLflow {mlflow.__version__}."
+        )
+
+    active_run = mlflow.active_run()
+    if active_run is None:
+        raise RuntimeError("'thetis_mlflow_async' must be called within an active MLflow run.")
+
+    run_id = active_run.info.run_id
+
+    kwargs = dict(
         config=config,
         predictions=predictions,
         annotations=annotations,
+        annotations_meta=annotations_meta,
         description=description,
         mlflow_step=mlflow_step,
         predictions_perturbations=predictions_perturbations,
         license_file_path=license_file_path,
         license_xml_str=license_xml_str,
         license_key_and_signature=license_key_and_signature,
+        profile=profile,
+        span_hook=span_hook,
     )
+
+    _pending.acquire()
+    try:
+        future = _get_executor().submit(_run_in_background, run_id, kwargs)
+    except BaseException:
+        _pending.release()
+        raise
+
+    future.add_done_callback(lambda _: _pending.release())
+
+    return future
@@ -0,0 +1,102 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides lightweight instrumentation to record the wall time, CPU time and peak memory of the
+individual stages of an evaluation run.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Callable, Iterator
+
+
+TIMINGS_KEY = "__timings__"
+
+# signature of span hooks: called with the stage name and its record when a stage has finished
+SpanHook = Callable[[str, Dict[str, float]], None]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """ High-water mark of the resident set size of the current process in MiB (None if not supported by the OS). """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # reported in bytes on macOS and in kilobytes on Linux
+    return peak / 1024. ** 2 if sys.platform == "darwin" else peak / 1024.
+
+
+def _rss_or_nan() -> float:
+    peak = _peak_rss_mb()
+    return float("nan") if peak is None else peak
+
+
+class Profiler(object):
+    """
+    Records wall time, CPU time and the peak memory (resident set size high-water mark) of named stages.
+    Stages can be nested; the name of a nested stage is prefixed by the names of its enclosing stages
+    (e.g., "thetis/evaluation").
+
+    Args:
+        enabled: If False, stages are not recorded and :meth:`stage` does not add any overhead.
+        span_hook: Optional function called with the name and record of each stage when it has finished. This can
+            be used to forward the stages to a tracing backend, e.g., as OpenTelemetry spans.
+    """
+
+    def __init__(self, enabled: bool = True, span_hook: Optional[SpanHook] = None):
+
+        self.enabled = enabled or span_hook is not None
+        self.span_hook = span_hook
+        self.records: Dict[str, Dict[str, float]] = {}
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Context manager that records a single stage.
+
+        Args:
+            name: Name of the stage.
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        self._stack.append(name)
+        full_name = "/".join(self._stack)
+        wall_start, cpu_start, rss_start = time.perf_counter(), time.process_time(), _rss_or_nan()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            rss_end = _rss_or_nan()
+            record = {
+                "wall_time_s": time.perf_counter() - wall_start,
+                "cpu_time_s": time.process_time() - cpu_start,
+                "peak_rss_mb": rss_end,
+                "peak_rss_increase_mb": rss_end - rss_start,
+            }
+            self.records[full_name] = record
+
+            if self.span_hook is not None:
+                self.span_hook(full_name, record)
+
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """ Return the records of all finished stages. """
+
+        return {name: dict(record) for name, record in self.records.items()}
+
+    def metrics(self, prefix: str = "timings") -> Dict[str, float]:
+        """ Return the records of all finished stages as flat metric dictionary, e.g., for MLflow logging. """
+
+        return {
+            f"{prefix}/{name}/{key}": value
+            for name, record in self.records.items()
+            for key, value in record.items()
+        }
@@ -0,0 +1,171 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides the robustness evaluation of an AI model under input perturbations (e.g., blur, noise or
+weather effects) by comparing the evaluation results on perturbed data to those on clean data.
+"""
+
+import os
+import numbers
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Union, Optional, Tuple, Dict, Iterable, Iterator, Mapping, Any
+import pandas as pd
+
+from .batch import _check_name
+from .batch import _init_worker
+from .batch import _evaluate
+from .batch import _evaluate_in_worker
+from .batch import _prepare_state
+from .batch import _resolve_n_jobs
+from .cache import ResultCache
+
+
+CLEAN = "clean"
+
+
+def _flatten_metrics(result: Dict, prefix: str = "") -> Dict[str, float]:
+    """ Flatten all numeric scalar entries of a (nested) result dictionary into "section/metric" keys. """
+
+    metrics = {}
+    for key, value in result.items():
+        name = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            metrics.update(_flatten_metrics(value, name))
+        elif isinstance(value, numbers.Real) and not isinstance(value, bool):
+            metrics[name] = float(value)
+
+    return metrics
+
+
+def _iter_perturbations(
+        perturbations: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]],
+        output_dir: Optional[str] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """ Iterate over (name, predictions) pairs and check for unique and valid perturbation names. """
+
+    items = perturbations.items() if isinstance(perturbations, Mapping) else perturbations
+
+    seen = {CLEAN}
+    for name, predictions in items:
+        if name in seen:
+            raise ValueError(f"Duplicate or reserved perturbation name '{name}'.")
+
+        _check_name(name, output_dir)
+        seen.add(name)
+        yield name, predictions
+
+
+def thetis_robustness(
+        *,
+        config: Union[str, os.PathLike, Dict],
+        predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame], str, os.PathLike],
+        annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        perturbations: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]],
+        annotations_meta: Optional[pd.DataFrame] = None,
+        description: Dict[str, str] = None,
+        output_dir: Optional[str] = None,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        license_key_and_signature: Tuple[str, str] = None,
+        cache: Optional[ResultCache] = None,
+        n_jobs: int = 1,
+) -> Dict[str, Any]:
+    """
+    Evaluate the robustness of an AI model against input perturbations. The predictions on the clean dataset and
+    on each perturbed dataset are evaluated as described in :func:`thetis.thetis` against the same annotations,
+    which are prepared only once and transferred only once to each worker process. The degradation is reported as
+    difference of each numeric metric on perturbed data to the respective metric on clean data.
+
+    Perturbations are consumed lazily: 'perturbations' may be a generator, and each entry may be a path to a file
+    written by :func:`thetis.write_json_with_pandas` that is loaded within the worker process. Such a file holds the
+    predictions in dictionary layout or a dictionary {"predictions": <predictions>}, which is required for
+    long-format tables (see 'annotations_meta'). At most two perturbations per worker process are held in memory at
+    the same time.
+
+    Note: You must provide one of the following arguments for license validation: `license_file_path`,
+    `license_xml_str`, or `license_key_and_signature`.
+
+    Args:
+        config: Application configuration options provided by the user.
+        predictions: Predictions made by the AI model on the clean dataset, see :func:`thetis.thetis`.
+        annotations: Ground truth data, see :func:`thetis.thetis`.
+        perturbations: Dictionary or iterable of (name, predictions) pairs with the predictions of the AI model for
+            each perturbation type (e.g., "blur", "noise"). Each entry must have the same format as 'predictions'.
+        annotations_meta: Detection only: image meta information for long-format inputs, see :func:`thetis.thetis`.
+        description: dict containing a description of your AI solution, see :func:`thetis.thetis`.
+        output_dir: Path to the output directory. The PDF report of the clean evaluation and of each perturbation
+            is stored within a subdirectory named "clean" or after the perturbation, respectively. Default is None.
+        license_file_path: Path to an XML license file to run the application.
+        license_xml_str: String representation of an XML license file to run the application.
+        license_key_and_signature: Tuple of license key and signature strings.
+        cache: Optional :class:`thetis.ResultCache` instance, see :func:`thetis.thetis`.
+        n_jobs: Number of worker processes used to evaluate the perturbations in parallel. Use -1 for all available
+            CPU cores. Default is 1 (sequential evaluation within the calling process).
+
+    Returns:
+        Dictionary with keys "clean" (evaluation results on clean data), "perturbations" (dictionary mapping each
+        perturbation name to its evaluation results) and "degradation" (pd.DataFrame with one row per perturbation
+        and one column per numeric metric, e.g. "performance/accuracy", holding the difference to the clean result).
+
+    Raises:
+        ValueError: if a perturbation name is used more than once or equals "clean".
+        ValueError: if 'output_dir' is given and a perturbation name is not a string or contains a path separator.
+        ValueError: if 'n_jobs' is neither a positive integer nor -1.
+    """
+
+    kwargs = dict(
+        config=config,
+        description=description,
+        output_dir=output_dir,
+        license_file_path=license_file_path,
+        license_xml_str=license_xml_str,
+        license_key_and_signature=license_key_and_signature,
+        cache=cache,
+    )
+
+    n_jobs = _resolve_n_jobs(n_jobs)
+    state = _prepare_state(annotations, annotations_meta, kwargs, mlflow_context=None)
+
+    names, results = [], {}
+    if n_jobs == 1:
+        results[CLEAN] = _evaluate(CLEAN, predictions, state)
+        for name, perturbed in _iter_perturbations(perturbations, output_dir):
+            names.append(name)
+            results[name] = _evaluate(name, perturbed, state)
+
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(state,)) as executor:
+            pending = {executor.submit(_evaluate_in_worker, CLEAN, predictions): CLEAN}
+
+            for name, perturbed in _iter_perturbations(perturbations, output_dir):
+
+                # bound the number of submitted perturbations so that lazy inputs are not materialized at once
+                if len(pending) >= 2 * n_jobs:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[pending.pop(future)] = future.result()
+
+                names.append(name)
+                pending[executor.submit(_evaluate_in_worker, name, perturbed)] = name
+
+            for future in wait(pending).done:
+                results[pending[future]] = future.result()
+
+    clean_metrics = _flatten_metrics(results[CLEAN])
+    degradation = pd.DataFrame.from_dict(
+        {
+            name: {
+                metric: value - clean_metrics[metric]
+                for metric, value in _flatten_metrics(results[name]).items()
+                if metric in clean_metrics
+            }
+            for name in names
+        },
+        orient="index",
+    )
+
+    return {
+        CLEAN: results[CLEAN],
+        "perturbations": {name: results[name] for name in names},
+        "degradation": degradation,
+    }
@@ -0,0 +1,461 @@
+#  @copyright (c) 2024 e:fs TechHub GmbH. All rights reserved.
+#  Dr.-Ludwig-Kraus-Straße 6, 85080 Gaimersheim, DE, https://www.efs-techhub.com
+"""
+This module provides a local evaluation server for the Thetis evaluation toolkit with a pool of pre-warmed worker
+processes, as well as the respective client. Predictions and annotations are transferred as Arrow IPC streams.
+
+Request format of :code:`POST /evaluate`: a 4-byte big-endian length of a JSON header, the JSON header itself, and
+the concatenated Arrow IPC streams of all tables. The header holds the evaluation arguments and the byte range of
+each table within the payload. The response body is the result dictionary in the JSON format of
+:func:`thetis.write_json_with_pandas`.
+"""
+
+import os
+import copy
+import json
+import struct
+import socket
+import builtins
+import functools
+import signal
+import tempfile
+import threading
+import multiprocessing
+import http.client
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Union, Optional, Tuple, Dict, Any
+import pandas as pd
+
+from .data import META_KEY
+from .data import IMAGE_ID_COLUMN
+from .io import _import_pyarrow
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# evaluation arguments that clients may set within the JSON header; the license is provided by the server
+_REQUEST_FIELDS = ("config", "config_yaml", "description", "output_dir")
+_TABLE_FIELDS = ("predictions", "annotations", "annotations_meta")
+
+# HTTP status codes for errors raised by an evaluation: invalid requests are client errors (400), license
+# errors are reported as forbidden (403), and all other errors (e.g., ThetisInternalError) as server errors (500)
+_CLIENT_ERRORS = (ValueError, TypeError, KeyError, AttributeError, SyntaxError, NotImplementedError, RuntimeError)
+_LICENSE_ERRORS = ("LicenseInvalidError", "LicenseExpiredError", "TaskNotLicensedError")
+
+# pyarrow is required for the transfer of tables between client and server
+_PYARROW_PURPOSE = "The Thetis evaluation server"
+
+# state of a worker process, set once by the pool initializer
+_worker_state: Dict[str, Any] = {}
+
+
+def _to_long_format(frames: Dict[Any, pd.DataFrame]) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """ Concatenate per-image detection DataFrames to a single table with an image identifier column. """
+
+    meta = frames.get(META_KEY)
+    images = {key: frame for key, frame in frames.items() if key != META_KEY}
+    table = pd.concat(images, names=[IMAGE_ID_COLUMN, None]).reset_index(level=0).reset_index(drop=True)
+
+    return table, meta
+
+
+def encode_request(header: Dict[str, Any], tables: Dict[str, Any]) -> bytes:
+    """
+    Encode an evaluation request.
+
+    Args:
+        header: JSON-serializable evaluation arguments.
+        tables: Dictionary with pd.DataFrame or pyarrow.Table instances.
+
+    Returns:
+        Request body.
+    """
+
+    pa = _import_pyarrow(_PYARROW_PURPOSE)
+
+    payloads, ranges, offset = [], {}, 0
+    for name, table in tables.items():
+        if isinstance(table, pd.DataFrame):
+            table = pa.Table.from_pandas(table, preserve_index=True)
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        buffer = sink.getvalue()
+        payloads.append(buffer)
+        ranges[name] = [offset, buffer.size]
+        offset += buffer.size
+
+    head = json.dumps({**header, "tables": ranges}).encode("utf-8")
+
+    return b"".join([struct.pack(">I", len(head)), head, *[memoryview(p) for p in payloads]])
+
+
+def decode_request(body: bytes) -> Dict[str, Any]:
+    """
+    Decode an evaluation request into the keyword arguments for :func:`thetis.thetis`.
+
+    Args:
+        body: Request body created by :func:`encode_request`.
+
+    Returns:
+        Dictionary with evaluation arguments and tables as pd.DataFrame instances.
+    """
+
+    pa = _import_pyarrow(_PYARROW_PURPOSE)
+
+    view = memoryview(body)
+    (head_length,) = struct.unpack(">I", view[:4])
+    header = json.loads(bytes(view[4:4 + head_length]).decode("utf-8"))
+    payload = view[4 + head_length:]
+
+    kwargs = {key: value for key, value in header.items() if key != "tables"}
+    for name, (offset, length) in header["tables"].items():
+        reader = pa.ipc.open_stream(pa.py_buffer(payload[offset:offset + length]))
+        kwargs[name] = reader.read_all().to_pandas()
+
+    return kwargs
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_config(config_yaml: str) -> Dict:
+    """ Parse a YAML config; configs are cached by their content within each worker. """
+
+    import yaml
+    return yaml.safe_load(config_yaml)
+
+
+def _init_worker(license_xml_str: Optional[str], cache_dir: Optional[str], output_root: Optional[str]) -> None:
+    """ Pool initializer: import the evaluation stack and store the resolved license once per worker process. """
+
+    from .service import thetis
+    from .cache import ResultCache
+
+    _import_pyarrow(_PYARROW_PURPOSE)
+
+    _worker_state.update(
+        thetis=thetis,
+        license_xml_str=license_xml_str,
+        cache=ResultCache(cache_dir) if cache_dir is not None else None,
+        output_root=output_root,
+    )
+
+
+def _resolve_output_dir(output_dir: Optional[str], output_root: Optional[str]) -> Optional[str]:
+    """ Resolve an output directory requested by a client below the output root directory of the server. """
+
+    if output_dir is None:
+        return None
+
+    if output_root is None:
+        raise ValueError("The server does not accept 'output_dir' as it has been started without an output root.")
+
+    root = os.path.realpath(output_root)
+    resolved = os.path.realpath(os.path.join(root, output_dir))
+    if os.path.isabs(output_dir) or resolved == root or os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"'output_dir' must be a relative path within the output root of the server: '{output_dir}'.")
+
+    return resolved
+
+
+def _error_status(error: Exception) -> int:
+    """ HTTP status code for an error raised by an evaluation. """
+
+    name = type(error).__name__
+    if name in _LICENSE_ERRORS:
+        return 403
+    if name.startswith("ThetisInternal") or not isinstance(error, _CLIENT_ERRORS):
+        return 500
+
+    return 400
+
+
+def _ping(_: int) -> int:
+    return os.getpid()
+
+
+def _evaluate(body: bytes) -> Tuple[int, bytes]:
+    """ Run a single evaluation request within a worker process and return HTTP status and response body. """
+
+    from .io import write_json_with_pandas
+
+    try:
+        kwargs = decode_request(body)
+
+        unknown = [key for key in kwargs if key not in _REQUEST_FIELDS + _TABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unsupported request fields: {unknown}")
+
+        kwargs["output_dir"] = _resolve_output_dir(kwargs.get("output_dir"), _worker_state["output_root"])
+        if "config_yaml" in kwargs:
+            kwargs["config"] = copy.deepcopy(_parse_config(kwargs.pop("config_yaml")))
+
+        result = _worker_state["thetis"](
+            license_xml_str=_worker_state["license_xml_str"],
+            cache=_worker_state["cache"],
+            **kwargs,
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "result.json")
+            write_json_with_pandas(json_like=result, filename=filename)
+            with open(filename, "rb") as f:
+                return 200, f.read()
+
+    except Exception as e:
+        return _error_status(e), json.dumps({"error": type(e).__name__, "message": str(e)}).encode("utf-8")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """ HTTP request handler forwarding evaluation requests to the worker pool of the server. """
+
+    server_version = "ThetisServer"
+
+    def address_string(self) -> str:
+        # Unix domain sockets do not provide a client address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _respond(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._respond(404, b'{"error": "NotFound"}')
+            return
+
+        body = json.dumps({"status": "ok", "workers": self.server.workers}).encode("utf-8")
+        self._respond(200, body)
+
+    def do_POST(self) -> None:
+        if self.path != "/evaluate":
+            self._respond(404, b'{"error": "NotFound"}')
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        status, response = self.server.pool.apply(_evaluate, (body,))
+        self._respond(status, response)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        socket_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        license_file_path: Union[str, os.PathLike] = None,
+        license_xml_str: str = None,
+        cache_dir: Optional[str] = None,
+        output_root: Optional[str] = None,
+) -> None:
+    """
+    Run a local evaluation server until interrupted. A pool of worker processes is started up front; each worker
+    imports the evaluation stack and reads the license file only once. YAML configs sent by clients are parsed once
+    per worker and cached by their content. Use :class:`ThetisClient` to submit evaluations.
+
+    Note: the server is intended for local use only and does not provide any authentication. Bind it to the
+    loopback interface or to a Unix domain socket with appropriate file permissions. Clients can only write PDF
+    reports to subdirectories of 'output_root'.
+
+    Args:
+        host: Host to bind the HTTP server to. Default is "127.0.0.1".
+        port: Port to bind the HTTP server to. Default is 8765.
+        socket_path: If given, the server listens on this Unix domain socket instead of host/port.
+        workers: Number of worker processes. Default is None (number of CPU cores).
+        license_file_path: Path to an XML license file used for all evaluations.
+        license_xml_str: String representation of an XML license file used for all evaluations.
+        cache_dir: Optional directory of a :class:`thetis.ResultCache` shared by all workers.
+        output_root: Optional directory below which clients may request output directories for PDF reports.
+            Default is None (requests with 'output_dir' are rejected).
+
+    Raises:
+        ImportError: if 'pyarrow' is not installed.
+    """
+
+    _import_pyarrow(_PYARROW_PURPOSE)
+
+    workers = workers or os.cpu_count()
+    context = multiprocessing.get_context("spawn")
+
+    # the license file is read only once and passed to the workers as string
+    if license_file_path is not None:
+        with open(license_file_path, "r", encoding="utf-8") as f:
+            license_xml_str = f.read()
+
+    with context.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(license_xml_str, cache_dir, output_root),
+    ) as pool:
+
+        # wait until all workers have finished their initialization
+        pool.map(_ping, range(workers))
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = _UnixServer(socket_path, _RequestHandler)
+        else:
+            server = _TCPServer((host, port), _RequestHandler)
+
+        server.pool = pool
+        server.workers = workers
+
+        # shut down gracefully on SIGTERM as well (e.g., when run as a service); the previous handler is restored
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+
+            server.server_close()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """ HTTP connection over a Unix domain socket. """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ThetisClient(object):
+    """
+    Client for a local Thetis evaluation server started by :func:`serve` or :code:`thetis serve`.
+
+    Args:
+        address: Server address, either "http://<host>:<port>" or "unix://<socket path>".
+            Default is "http://127.0.0.1:8765".
+        timeout: Optional timeout in seconds for each request.
+    """
+
+    def __init__(self, address: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: Optional[float] = None):
+
+        self.address = address
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith("unix://"):
+            return _UnixHTTPConnection(self.address[len("unix://"):], timeout=self.timeout)
+
+        host_port = self.address.split("://", 1)[-1].rstrip("/")
+        return http.client.HTTPConnection(host_port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, bytes]:
+        connection = self._connection()
+        try:
+            connection.request(method, path, body=body, headers={"Content-Type": "application/octet-stream"})
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def health(self) -> Dict:
+        """ Return the server status. """
+
+        _, body = self._request("GET", "/health")
+        return json.loads(body)
+
+    def evaluate(
+            self,
+            *,
+            config: Union[str, os.PathLike, Dict],
+            predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame], Any],
+            annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame], Any],
+            annotations_meta: Optional[pd.DataFrame] = None,
+            description: Dict[str, str] = None,
+            output_dir: Optional[str] = None,
+    ) -> Dict:
+        """
+        Submit an evaluation to the server. The arguments are the same as for :func:`thetis.thetis`; detection data
+        in the dictionary layout is transferred in long format. The license is provided by the server.
+
+        Args:
+            config: Application configuration options (dict or path to a YAML file).
+            predictions: Predictions made by the AI model.
+            annotations: Ground truth data.
+            annotations_meta: Detection only: image meta information for long-format inputs.
+            description: dict containing a description of your AI solution.
+            output_dir: Output directory for the PDF report, given relative to the output root of the server.
+
+        Returns:
+            Dictionary with the evaluation results, rating scores, and recommendations for the examined AI model.
+
+        Raises:
+            RuntimeError: if the server cannot be reached or returned an unexpected response.
+            Exception: the error raised by the evaluation on the server; built-in exception types are re-raised
+                with their original type, all others (e.g., license errors) as RuntimeError.
+        """
+
+        from .io import read_json_with_pandas
+
+        if isinstance(annotations, dict):
+            annotations, annotations_meta = _to_long_format(annotations)
+        if isinstance(predictions, dict):
+            predictions, _ = _to_long_format(predictions)
+
+        header = {"description": description, "output_dir": output_dir}
+        if isinstance(config, dict):
+            header["config"] = config
+        else:
+            with open(config, "r", encoding="utf-8") as f:
+                header["config_yaml"] = f.read()
+
+        tables = {"predictions": predictions, "annotations": annotations}
+        if annotations_meta is not None:
+            tables["annotations_meta"] = annotations_meta
+
+        try:
+            status, body = self._request("POST", "/evaluate", encode_request(header, tables))
+        except OSError as e:
+            raise RuntimeError(f"Could not reach Thetis evaluation server at '{self.address}': {e}") from e
+
+        if status != 200:
+            try:
+                error = json.loads(body)
+            except ValueError:
+                raise RuntimeError(f"Unexpected response from Thetis evaluation server (status {status}).")
+
+            name, message = error.get("error", ""), error.get("message", "")
+            error_type = getattr(builtins, name, None)
+            if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+                raise RuntimeError(f"{name} (status {status}): {message}")
+
+            raise error_type(message)
+
+        # the result is transferred in the JSON format of 'write_json_with_pandas'
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "result.json")
+            with open(filename, "wb") as f:
+                f.write(body)
+
+            return read_json_with_pandas(filename)
+
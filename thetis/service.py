@@ -10,12 +10,20 @@ import pandas as pd
 
 from thetiscore import thetis as thetiscore_main
 
+from .data import prepare_inputs
+from .cache import ResultCache
+from .cache import license_fingerprint
+from .profiling import Profiler
+from .profiling import SpanHook
+from .profiling import TIMINGS_KEY
+
 
 def thetis(
         *,
         config: Union[str, os.PathLike, Dict],
         predictions: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
         annotations: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        annotations_meta: Optional[pd.DataFrame] = None,
         description: Dict[str, str] = None,
         output_dir: Optional[str] = None,
         predictions_perturbations: None = None,
@@ -23,6 +31,9 @@ def thetis(
         license_xml_str: str = None,
         license_key_and_signature: Tuple[str, str] = None,
         return_svg: Optional[bool] = False,
+        cache: Optional[ResultCache] = None,
+        profile: bool = False,
+        span_hook: Optional[SpanHook] = None,
 ) -> Dict:
     """
     Main function for the Thetis evaluation toolkit. Given a ground truth dataset and the respective predictions
@@ -46,6 +57,10 @@ def thetis(
             coordinates and optionally sensitive attributes. The bounding box columns must correspond to the format
             specified in the user configuration. Must also include a "__meta__" key with image metadata.
             **Regression:** DataFrame with columns "target" and optionally sensitive attributes.
+        annotations_meta: Detection only: DataFrame with image meta information (columns "width" and "height"),
+            indexed by the image identifier. If given, 'predictions' and 'annotations' are expected in long format
+            as a single DataFrame (or pyarrow.Table) each with one row per bounding box and an additional column
+            "image_id". Default is None (dictionary layout).
         description: dict containing a description of your AI solution required for creating a technical documentation
             in accordance with Article 11 and Annex IV of the AI Act. The data entered here includes the title,
             provider, contact person (intern), contact person (extern), purpose, requirements, forms of distribution,
@@ -60,6 +75,20 @@ def thetis(
         return_svg: boolean flag which enables/disables returning Matplotlib (SVG) figures. Default is False to filter
             out these figures as they cannot be serialized in plain JSON format. Set to True explicitly if
             you want to obtain the figures directly.
+        cache: Optional :class:`thetis.ResultCache` instance. If given, the result and the artifacts written to
+            'output_dir' are looked up/stored by a content hash of the configuration, the input data and the package
+            versions, so repeated evaluations of unchanged inputs are served from disk. Cached results are only
+            returned within one hour after thetiscore has verified the same license arguments, which is recorded in
+            the cache directory and shared by all processes using it. For CI jobs that write the license file anew
+            for each run, create the cache with 'skip_license_check=True' to obtain cache hits, see
+            :class:`thetis.ResultCache`. Results are not cached if 'return_svg' is True. Default is None (no caching).
+        profile: If True, the wall time, CPU time and peak memory of the stages of this call are recorded and
+            returned within the section "__timings__" of the result dictionary. The stages are "thetis" (total),
+            "thetis/prepare_inputs", "thetis/cache_key" and "thetis/evaluation" (evaluation by thetiscore including
+            figure and report rendering). Default is False.
+        span_hook: Optional function called with the name and the record (dict with "wall_time_s", "cpu_time_s",
+            "peak_rss_mb", "peak_rss_increase_mb") of each stage when it has finished, e.g., to forward the stages
+            to a tracing backend. Default is None.
 
     Returns:
         Dictionary with the evaluation results, rating scores, and recommendations for the examined AI model.
@@ -105,6 +134,8 @@ def thetis(
         AttributeError: if the requested column for a sensitive feature does not exist within the ground truth dataset.
         AttributeError: if the field '__meta__' within the ground truth dataset annotations is completely missing.
         AttributeError: if the meta information provided by '__meta__' is missing for a certain image.
+        AttributeError: if 'annotations_meta' is given but column "image_id" is missing in 'predictions' or
+            'annotations' (detection).
         ValueError: if "distinct_classes" in application config contains duplicates (classification or detection).
         ValueError: if the data type conversion to one of "int" or "str" of column "labels" failed
             (classification or detection).
@@ -125,6 +156,9 @@ def thetis(
         ValueError: if a sensitive feature has a missing or invalid entry.
         ValueError: if a sensitive feature has less than 2 distinct labels.
         ValueError: if the image width or height information provided by '__meta__' for a certain image are <= 0.
+        ValueError: if 'annotations_meta' is given but its image identifiers contain duplicates (detection).
+        ValueError: if 'annotations_meta' is given but 'predictions' or 'annotations' contain image identifiers
+            without meta information (detection).
         ValueError: if bbox_format is 'xyxy' and xmin > xmax (detection).
         ValueError: if bbox_format is 'xyxy' and ymin > ymax (detection).
         ValueError: if bbox_format is 'xywh' or 'cxcywh' and width is negative (detection).
@@ -132,6 +166,8 @@ def thetis(
         NotImplementedError: if task is not one of "classification", "regression", or "detection".
         NotImplementedError: if the bounding box matching strategy is not one of "exclusive", "max".
         TypeError: if config is neither str nor python dict.
+        TypeError: if 'annotations_meta' is given but 'predictions', 'annotations' or 'annotations_meta' is
+            neither pd.DataFrame nor pyarrow.Table (detection).
         TypeError: if 'predictions' is not type pd.DataFrame (classification or regression).
         TypeError: if 'annotations' is not type pd.DataFrame (classification or regression).
         TypeError: if 'predictions' is not type dict (detection).
@@ -152,15 +188,47 @@ def thetis(
         thetiscore.errors.ThetisInternalError: if an unexpected application error occurred.
     """
 
-    return thetiscore_main(
-        config=config,
-        predictions=predictions,
-        annotations=annotations,
-        description=description,
-        output_dir=output_dir,
-        predictions_perturbations=predictions_perturbations,
-        license_file_path=license_file_path,
-        license_xml_str=license_xml_str,
-        license_key_and_signature=license_key_and_signature,
-        return_svg=return_svg,
-    )
+    profiler = Profiler(enabled=profile, span_hook=span_hook)
+
+    with profiler.stage("thetis"):
+        with profiler.stage("prepare_inputs"):
+            predictions, annotations = prepare_inputs(predictions, annotations, annotations_meta)
+
+        def compute() -> Dict:
+            with profiler.stage("evaluation"):
+                return thetiscore_main(
+                    config=config,
+                    predictions=predictions,
+                    annotations=annotations,
+                    description=description,
+                    output_dir=output_dir,
+                    predictions_perturbations=predictions_perturbations,
+                    license_file_path=license_file_path,
+                    license_xml_str=license_xml_str,
+                    license_key_and_signature=license_key_and_signature,
+                    return_svg=return_svg,
+                )
+
+        if cache is None or return_svg:
+            result = compute()
+        else:
+            with profiler.stage("cache_key"):
+                key = cache.key(
+                    config=config,
+                    predictions=predictions,
+                    annotations=annotations,
+                    description=description,
+                    predictions_perturbations=predictions_perturbations,
+                )
+
+            fingerprint = license_fingerprint(
+                license_file_path=license_file_path,
+                license_xml_str=license_xml_str,
+                license_key_and_signature=license_key_and_signature,
+            )
+            result = cache.get_or_compute(key, compute, output_dir=output_dir, license_fingerprint=fingerprint)
+
+    if profile:
+        result[TIMINGS_KEY] = profiler.timings()
+
+    return result